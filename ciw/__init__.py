@@ -8,8 +8,19 @@ from .server import Server
 from .individual import Individual
 from .arrival_node import ArrivalNode
 from .exit_node import ExitNode
+from .deadlock_detector import analyse_deadlock, DeadlockAnalysis
+from .future_event_list import FutureEventList
+from .samplers import *
 from .node import Node
 from .state_tracker import *
 from .exactnode import *
+from .ticknode import *
 from .import_params import *
 from .network import *
+from .replication import *
+from .warmup import *
+from .online_statistics import *
+from .time_averages import *
+from .retention import *
+from .quantiles import *
+from .record_sinks import *
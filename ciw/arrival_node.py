@@ -1,5 +1,5 @@
 from __future__ import division
-from random import random
+from heapq import heappush, heappop
 from .individual import Individual
 
 
@@ -12,6 +12,7 @@ class ArrivalNode(object):
         Initialise a node.
         """
         self.simulation = simulation
+        self.id_number = 0
         self.number_of_individuals = 0
         self.number_accepted_individuals = 0
         self.event_dates_dict = {nd + 1: {cls:False for cls in range(
@@ -23,6 +24,8 @@ class ArrivalNode(object):
         self.baulked_dict = {nd + 1: {cls:[] for cls in range(
             self.simulation.network.number_of_classes)}
             for nd in range(self.simulation.network.number_of_nodes)}
+        self.arrival_streams = []
+        self.stream_entries = {}
         self.initialise_event_dates_dict()
         self.find_next_event_date()
 
@@ -32,6 +35,15 @@ class ArrivalNode(object):
         """
         return 'Arrival Node'
 
+    @property
+    def next_event_date(self):
+        return self._next_event_date
+
+    @next_event_date.setter
+    def next_event_date(self, date):
+        self._next_event_date = date
+        self.simulation.event_list.schedule(self, date)
+
     def decide_baulk(self, next_node, next_individual):
         """
         Either makes an individual baulk, or sends the individual
@@ -40,7 +52,8 @@ class ArrivalNode(object):
         if next_node.baulking_functions[self.next_class] == None:
             self.send_individual(next_node, next_individual)
         else:
-            rnd_num = random()
+            rnd_num = self.simulation.find_rng('Baulking',
+                next_node.id_number, self.next_class).random()
             if rnd_num < next_node.baulking_functions[self.next_class](
                 next_node.number_of_individuals):
                 self.record_baulk(next_node)
@@ -49,19 +62,16 @@ class ArrivalNode(object):
 
     def find_next_event_date(self):
         """
-        Finds the time of the next arrival.
+        Finds the time of the next arrival. Simultaneous arrivals
+        are ordered by node, then by customer class.
         """
-        times = [[self.event_dates_dict[nd+1][cls]
-            for cls in range(len(self.event_dates_dict[1]))]
-            for nd in range(len(self.event_dates_dict))]
-
-        mintimes = [min(obs) for obs in times]
-        nd = mintimes.index(min(mintimes))
-        cls = times[nd].index(min(times[nd]))
-        self.next_node = nd + 1
-        self.next_class = cls
-        self.next_event_date = self.event_dates_dict[
-            self.next_node][self.next_class]
+        while self.arrival_streams and not self.arrival_streams[0][-1]:
+            heappop(self.arrival_streams)
+        if self.arrival_streams:
+            date, self.next_node, self.next_class, _ = self.arrival_streams[0]
+        else:
+            date, self.next_node, self.next_class = float('Inf'), 1, 0
+        self.next_event_date = date
 
     def have_event(self):
         """
@@ -75,12 +85,11 @@ class ArrivalNode(object):
                                      priority_class)
         next_node = self.simulation.transitive_nodes[self.next_node-1]
         self.release_individual(next_node, next_individual)
-        self.event_dates_dict[self.next_node][
-            self.next_class] = self.increment_time(
-            self.event_dates_dict[self.next_node][
+        self.schedule_arrival(self.next_node, self.next_class,
+            self.increment_time(self.event_dates_dict[self.next_node][
             self.next_class], self.inter_arrival(
             self.next_node, self.next_class,
-            self.next_event_date))
+            self.next_event_date)))
         self.find_next_event_date()
 
     def increment_time(self, original, increment):
@@ -94,19 +103,18 @@ class ArrivalNode(object):
         Initialises the next event dates dictionary
         with random times for each node and class.
         """
+        self.arrival_streams = []
+        self.stream_entries = {}
         for nd in self.event_dates_dict:
             for cls in self.event_dates_dict[nd]:
-                self.event_dates_dict[nd][
-                cls] = self.inter_arrival(nd, cls, 0.0)
+                self.schedule_arrival(nd, cls, self.inter_arrival(nd, cls, 0.0))
 
     def inter_arrival(self, nd, cls, current_time):
         """
         Samples the inter-arrival time for next class and node.
         """
-        if self.simulation.network.customer_classes[
-            cls].arrival_distributions[nd-1][0] == "TimeDependent":
-            return self.simulation.inter_arrival_times[nd][cls](current_time)
-        return self.simulation.inter_arrival_times[nd][cls]()
+        return self.simulation.inter_arrival_times[nd][cls].sample(
+            current_time)
 
     def record_baulk(self, next_node):
         """
@@ -132,6 +140,22 @@ class ArrivalNode(object):
         else:
             self.decide_baulk(next_node, next_individual)
 
+    def schedule_arrival(self, nd, cls, date):
+        """
+        Sets the date of the next arrival of the given node and
+        class. Only streams with finite dates are kept in the
+        arrival streams heap; superseded entries are marked as
+        inactive and discarded lazily.
+        """
+        self.event_dates_dict[nd][cls] = date
+        old_entry = self.stream_entries.pop((nd, cls), None)
+        if old_entry is not None:
+            old_entry[-1] = False
+        if date < float('Inf'):
+            entry = [date, nd, cls, True]
+            self.stream_entries[(nd, cls)] = entry
+            heappush(self.arrival_streams, entry)
+
     def send_individual(self, next_node, next_individual):
         """
         Sends the next_individual to the next_node
@@ -1,24 +1,51 @@
 import random
+from bisect import bisect_left
+from hashlib import sha256
+
+__all__ = ['random', 'seed', 'seed_entropy', 'stream_rng', 'random_choice',
+           'WeightedChoice']
+
+_seed = None
 
 def seed(z):
 	"""
 	Sets all seeds used to generate random number streams.
 	Currently conrains:
 		- random library
-	Previously contained:
-		- numpy
+		- numpy sampling streams (through seed_entropy)
 	"""
+	global _seed
+	_seed = z
 	random.seed(z)
 
-def random_choice(array, probs=None):
+def seed_entropy():
+	"""
+	Returns the last seed set with ciw.seed as a non-negative
+	integer, or None if no seed has been set.
+	"""
+	if _seed is None:
+		return None
+	if isinstance(_seed, int) and _seed >= 0:
+		return _seed
+	return int(sha256(repr(_seed).encode('utf-8')).hexdigest(), 16)
+
+def stream_rng(master_seed, *key):
+	"""
+	Returns an independent random number generator for the stream
+	identified by key, derived deterministically from the master seed.
+	"""
+	return random.Random('-'.join([str(k) for k in (master_seed,) + key]))
+
+def random_choice(array, probs=None, rng=random):
 	"""
 	This function takes in an array of values to make a choice from,
 	and an pdf corresponding to those values. It returns a random choice
-	from that array, using the probs as weights.
+	from that array, using the probs as weights. Random numbers are
+	drawn from rng, the global random module by default.
 	"""
 	# If no pdf provided, assume uniform dist:
 	if probs == None:
-		index = int(random.random() * len(array))
+		index = int(rng.random() * len(array))
 		return array[index]
 
 	# A common case, guaranteed to reach the Exit node;
@@ -27,9 +54,39 @@ def random_choice(array, probs=None):
 		return array[-1]
 
 	# Sample a random value from using pdf
-	rdm_num = random.random()
+	rdm_num = rng.random()
 	i, p = 0, probs[0]
 	while rdm_num > p:
 		i += 1
 		p += probs[i]
-	return array[i]
\ No newline at end of file
+	return array[i]
+
+class WeightedChoice(object):
+	"""
+	A random choice from an array of values with fixed probabilities.
+	The probabilities are accumulated once, so that each choice is a
+	binary search over the cumulative probabilities. Makes the same
+	choices as random_choice, using the same random numbers.
+	"""
+	def __init__(self, array, probs, rng=random):
+		self.rng = rng
+		self.array = list(array)
+		self.cumulative = []
+		p = 0.0
+		for prob in probs:
+			p += prob
+			self.cumulative.append(p)
+		self.last = len(self.array) - 1
+		# The common case guaranteed to reach the last value (the
+		# Exit node when routing) needs no sample:
+		self.certain = ((len(probs) > 1) and
+			(set(probs[:-1]) == set([0.0])) and (probs[-1] == 1.0))
+
+	def choose(self):
+		"""
+		Returns a random choice from the array.
+		"""
+		if self.certain:
+			return self.array[-1]
+		i = bisect_left(self.cumulative, self.rng.random())
+		return self.array[min(i, self.last)]
@@ -2,8 +2,13 @@ from __future__ import division
 
 class DataRecord(object):
     """
-    A class for a data record
+    A class for a data record. The service time, wait and time
+    blocked are derived from the dates when they are read.
     """
+    __slots__ = ['arrival_date', 'service_start_date', 'service_end_date',
+                 'exit_date', 'node', 'destination', 'customer_class',
+                 'queue_size_at_arrival', 'queue_size_at_departure']
+
     def __init__(self,
                 arrival_date,
                 service_end_date,
@@ -18,18 +23,27 @@ class DataRecord(object):
         Initialises a data record instance.
         """
         self.arrival_date = arrival_date
-        self.service_time = service_end_date - service_start_date
         self.service_start_date = service_start_date
         self.exit_date = exit_date
         self.customer_class = customer_class
         self.queue_size_at_arrival = queue_size_at_arrival
         self.queue_size_at_departure = queue_size_at_departure
         self.service_end_date = service_end_date
-        self.wait = self.service_start_date - self.arrival_date
-        self.blocked = self.exit_date - self.service_end_date
         self.node = node
         self.destination = destination
 
+    @property
+    def service_time(self):
+        return self.service_end_date - self.service_start_date
+
+    @property
+    def wait(self):
+        return self.service_start_date - self.arrival_date
+
+    @property
+    def blocked(self):
+        return self.exit_date - self.service_end_date
+
     def __repr__(self):
         """
         Represents the Data Record
@@ -1,5 +1,67 @@
+from collections import namedtuple
 import networkx as nx
 
+DeadlockAnalysis = namedtuple('DeadlockAnalysis', 'verdict reason')
+
+
+def analyse_deadlock(network, custom_nodes=False):
+    """
+    Decides, from the network's structure alone, whether it can
+    deadlock. A customer can only be blocked by a node of finite
+    capacity, and only blocks further customers if it holds one of
+    finitely many servers, so deadlock needs a cycle of such nodes,
+    linked by routes with positive probability for some class.
+
+    Returns a DeadlockAnalysis whose verdict is 'deadlock-free',
+    'possible' or 'unknown', with the reason.
+    """
+    if custom_nodes:
+        return DeadlockAnalysis('unknown',
+            'Custom node classes may route or block customers differently.')
+    finite_servers = [centre.schedule is not None or
+        centre.number_of_servers < float('Inf')
+        for centre in network.service_centres]
+    finite_capacity = [finite and centre.queueing_capacity < float('Inf')
+        for finite, centre in zip(finite_servers, network.service_centres)]
+    nodes = range(network.number_of_nodes)
+    blocks = {i: [j for j in nodes if finite_servers[i] and
+        finite_capacity[j] and any(cls.transition_matrix[i][j] > 0
+        for cls in network.customer_classes)] for i in nodes}
+    cycle = find_cycle(blocks)
+    if cycle is None:
+        return DeadlockAnalysis('deadlock-free',
+            'No cycle of nodes can block each other: customers are only '
+            'blocked by nodes of finite capacity, and only block others '
+            'at nodes with finitely many servers.')
+    return DeadlockAnalysis('possible', 'Nodes %s can block each other.' %
+        ' -> '.join(str(i + 1) for i in cycle + [cycle[0]]))
+
+
+def find_cycle(digraph):
+    """
+    Returns a list of the vertices of a cycle of the digraph,
+    given as a dictionary of successors, or None if it is acyclic.
+    """
+    state = {}
+    for root in digraph:
+        if root in state:
+            continue
+        path = [root]
+        state[root] = 'on path'
+        successors = [iter(digraph[root])]
+        while successors:
+            v = next(successors[-1], None)
+            if v is None:
+                state[path.pop()] = 'done'
+                successors.pop()
+            elif state.get(v) == 'on path':
+                return path[path.index(v):]
+            elif v not in state:
+                path.append(v)
+                state[v] = 'on path'
+                successors.append(iter(digraph[v]))
+    return None
+
 
 class NoDeadlockDetection(object):
     """
@@ -37,6 +99,13 @@ class NoDeadlockDetection(object):
         """
         pass
 
+    def detect_new_deadlock(self):
+        """
+        Detects whether deadlock has arisen since the last check.
+        By default this is a full check for deadlock.
+        """
+        return self.detect_deadlock()
+
 
 class StateDigraphMethod(NoDeadlockDetection):
     """
@@ -46,12 +115,78 @@ class StateDigraphMethod(NoDeadlockDetection):
         directed edge from vertices j -> k iff the customer
         at server j is blocked from entering the node that
         contains k.
+    Each server is given an integer vertex number, and the
+    digraph is kept as sets of successors and predecessors.
+
+    If not active, as on networks that cannot deadlock, the servers
+    are still added as vertices but no edges are kept and deadlock
+    is never detected.
     """
-    def __init__(self):
+    def __init__(self, active=True):
         """
         Initialises the state digraph detection mechanism class
         """
-        self.statedigraph = nx.DiGraph()
+        self.active = active
+        self.vertex_servers = []
+        self.successors = []
+        self.predecessors = []
+        self.changed_vertices = set()
+
+    def add_vertex(self, server=None):
+        """
+        Adds a vertex, for the given server, and returns its number.
+        """
+        vertex = len(self.successors)
+        self.vertex_servers.append(server)
+        self.successors.append(set())
+        self.predecessors.append(set())
+        if server is not None:
+            server.vertex = vertex
+        return vertex
+
+    def find_vertex(self, server):
+        """
+        Returns the vertex number of the server, adding it if needed.
+        """
+        if server.vertex is None:
+            return self.add_vertex(server)
+        return server.vertex
+
+    def add_edge(self, tail, head):
+        """
+        Adds an edge between two vertices.
+        """
+        self.successors[tail].add(head)
+        self.predecessors[head].add(tail)
+        self.changed_vertices.add(tail)
+
+    def remove_edges(self, vertex):
+        """
+        Removes all edges to and from a vertex. Removing an edge can
+        close off the region around its tail, so the tails are
+        checked at the next check for new deadlock.
+        """
+        for head in self.successors[vertex]:
+            self.predecessors[head].discard(vertex)
+        for tail in self.predecessors[vertex]:
+            self.successors[tail].discard(vertex)
+        self.changed_vertices.update(self.predecessors[vertex])
+        self.successors[vertex] = set()
+        self.predecessors[vertex] = set()
+
+    @property
+    def statedigraph(self):
+        """
+        A NetworkX digraph of the current state, with vertices named
+        by their servers.
+        """
+        names = [str(server) if server is not None else vertex
+            for vertex, server in enumerate(self.vertex_servers)]
+        digraph = nx.DiGraph()
+        digraph.add_nodes_from(names)
+        digraph.add_edges_from((names[tail], names[head])
+            for tail, heads in enumerate(self.successors) for head in heads)
+        return digraph
 
     def initialise_at_node(self, node):
         """
@@ -59,58 +194,84 @@ class StateDigraphMethod(NoDeadlockDetection):
         Adds the servers of that node if c < Inf.
         """
         if node.c < float('Inf'):
-            self.statedigraph.add_nodes_from([str(s)for s in node.servers])
+            for server in node.servers:
+                self.add_vertex(server)
 
     def detect_deadlock(self):
         """
         Detects whether the system is in a deadlocked state,
-        that is, is there a knot. Note that this code is taken
-        and adapted from the NetworkX Developer Zone Ticket
-        #663 knot.py (09/06/2015)
-        """
-        knots = []
-        for subgraph in nx.strongly_connected_component_subgraphs(self.statedigraph):
-            nodes = set(subgraph.nodes())
-            if len(nodes) == 1:
-                n = nodes.pop()
-                nodes.add(n)
-                if set(self.statedigraph.successors(n)) == nodes:
-                    knots.append(subgraph)
-            else:
-                for n in nodes:
-                    successors = nx.descendants(self.statedigraph, n)
-                    if successors <= nodes:
-                        knots.append(subgraph)
-                        break
-        if len(knots) > 0:
-            return True
-        return False
+        that is, is there a knot.
+        """
+        return any(self.in_knot(vertex)
+            for vertex in range(len(self.successors)))
+
+    def detect_new_deadlock(self):
+        """
+        Detects whether a knot has formed since the last check. A
+        new knot must contain the tail of an edge added or removed
+        since then, so only those vertices are checked, each within
+        the region reachable from it.
+        """
+        if not self.active:
+            return False
+        changed_vertices = self.changed_vertices
+        self.changed_vertices = set()
+        return any(self.in_knot(vertex) for vertex in changed_vertices)
+
+    def in_knot(self, vertex):
+        """
+        Whether the vertex is in a knot: it reaches itself, and every
+        vertex it reaches can reach it back.
+        """
+        successors = self.successors
+        if not successors[vertex]:
+            return False
+        reachable = set()
+        stack = [vertex]
+        while stack:
+            for v in successors[stack.pop()]:
+                if v not in reachable:
+                    reachable.add(v)
+                    stack.append(v)
+        if vertex not in reachable:
+            return False
+        predecessors = self.predecessors
+        reaching = set([vertex])
+        stack = [vertex]
+        while stack:
+            for v in predecessors[stack.pop()]:
+                if v in reachable and v not in reaching:
+                    reaching.add(v)
+                    stack.append(v)
+        return len(reaching) == len(reachable)
 
     def action_at_attach_server(self, node, server, individual):
         """
         The action taken at the 'attach_server' method of the node.
         """
+        if not self.active:
+            return
+        head = None
         for blq in node.blocked_queue:
-            inds = [ind for ind in node.simulation.nodes[
-                blq[0]].all_individuals if ind.id_number == blq[1]]
-            ind = inds[0]
-            if ind != individual:
-                self.statedigraph.add_edge(
-                    str(ind.server), str(server))
+            ind = node.simulation.nodes[blq[0]].blocked_individuals[blq[1]]
+            if ind is not individual and ind.server is not None:
+                if head is None:
+                    head = self.find_vertex(server)
+                self.add_edge(self.find_vertex(ind.server), head)
 
     def action_at_blockage(self, individual, next_node):
         """
         The action takn at the 'block_individual' method of the node.
         """
+        if not self.active or individual.server is None:
+            return
+        tail = self.find_vertex(individual.server)
         for svr in next_node.servers:
-            self.statedigraph.add_edge(
-                str(individual.server), str(svr))
+            self.add_edge(tail, self.find_vertex(svr))
 
     def action_at_detach_server(self, server):
         """
         The action taken at the 'detatch_server' method of the node.
         """
-        self.statedigraph.remove_edges_from(
-            self.statedigraph.in_edges(
-            str(server)) + self.statedigraph.out_edges(
-            str(server)))
+        if self.active and server.vertex is not None:
+            self.remove_edges(server.vertex)
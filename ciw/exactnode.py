@@ -18,9 +18,8 @@ class ExactNode(Node):
         """
         Returns a service time for the given customer class
         """
-        if self.simulation.network.customer_classes[cls].service_distributions[self.id_number-1][0] == "TimeDependent":
-            return Decimal(str(self.simulation.service_times[self.id_number][cls](current_time)))
-        return Decimal(str(self.simulation.service_times[self.id_number][cls]()))
+        return Decimal(str(self.simulation.service_times[self.id_number][
+            cls].sample(current_time)))
 
 
     def get_now(self, current_time):
@@ -46,7 +45,6 @@ class ExactArrivalNode(ArrivalNode):
         """
         Samples the inter-arrival time for next class and node.
         """
-        if self.simulation.network.customer_classes[cls].arrival_distributions[nd-1][0] == "TimeDependent":
-            return Decimal(str(self.simulation.inter_arrival_times[nd][cls](current_time)))
-        return Decimal(str(self.simulation.inter_arrival_times[nd][cls]()))
+        return Decimal(str(self.simulation.inter_arrival_times[nd][
+            cls].sample(current_time)))
 
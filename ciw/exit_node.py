@@ -1,19 +1,31 @@
 from __future__ import division
+from .retention import RetainAll
 
 class ExitNode(object):
     """
     Class for the exit node on our network
     """
-    def __init__(self):
+    def __init__(self, retention=None):
         """
-        Initialise a node.
+        Initialise a node. The retention policy decides which
+        finished individuals are kept, all of them by default.
         """
-        self.all_individuals = []
+        if retention is None:
+            retention = RetainAll()
+        self.retention = retention
         self.id_number = -1
         self.next_event_date = float("Inf")
         self.node_capacity = float("Inf")
         self.number_completed = 0
 
+    @property
+    def all_individuals(self):
+        return self.retention.individuals
+
+    @property
+    def number_of_individuals(self):
+        return self.number_completed
+
     def __repr__(self):
         """
         Representation of a node.
@@ -24,7 +36,7 @@ class ExitNode(object):
         """
         Adds customer to the list of completed customers
         """
-        self.all_individuals.append(next_individual)
+        self.retention.retain(next_individual)
         self.number_completed += 1
 
     def update_next_event_date(self):
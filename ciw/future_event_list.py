@@ -0,0 +1,103 @@
+from __future__ import division
+from heapq import heappush, heappop, heapify
+
+from .auxiliary import random_choice
+
+
+class FutureEventList(object):
+    """
+    A priority queue of the nodes' next event dates, keyed by
+    (event date, tie-break sequence). Nodes reschedule themselves
+    whenever their next event date changes; superseded entries are
+    marked as removed and discarded lazily.
+
+    Tie-break policies for simultaneous events:
+        - 'Random': choose uniformly between the tied nodes
+        - 'Ordered': choose the tied node with the lowest id number
+    """
+    def __init__(self, simulation, tie_break='Random'):
+        """
+        Initialises the future event list
+        """
+        if tie_break not in ['Random', 'Ordered']:
+            raise ValueError("Invalid 'tie_break' policy.")
+        self.simulation = simulation
+        self.tie_break = tie_break
+        self.heap = []
+        self.entries = {}
+        self.sequence = 0
+
+    def __len__(self):
+        """
+        The number of pending events
+        """
+        return len(self.entries)
+
+    def schedule(self, node, date):
+        """
+        Schedules the node's next event at the given date,
+        removing any previously scheduled event of that node.
+        Infinite dates are not stored.
+        """
+        old_entry = self.entries.get(node)
+        if old_entry is not None:
+            if old_entry[0] == date:
+                return
+            old_entry[-1] = None
+            del self.entries[node]
+        if date < float('Inf'):
+            entry = [date, node.id_number, self.sequence, node]
+            self.sequence += 1
+            self.entries[node] = entry
+            heappush(self.heap, entry)
+        if len(self.heap) > 2 * len(self.entries) + 32:
+            self.compact()
+
+    def compact(self):
+        """
+        Rebuilds the heap without the removed entries
+        """
+        self.heap = [entry for entry in self.heap if entry[-1] is not None]
+        heapify(self.heap)
+
+    def discard_removed(self):
+        """
+        Pops removed entries from the top of the heap
+        """
+        while self.heap and self.heap[0][-1] is None:
+            heappop(self.heap)
+
+    def tied_entries(self):
+        """
+        Returns the live entries that share the earliest date, in
+        tie-break order. As the heap property holds, these form a
+        subtree containing the root, so only that subtree is visited.
+        """
+        heap = self.heap
+        date = heap[0][0]
+        tied, stack = [], [0]
+        while stack:
+            i = stack.pop()
+            if i < len(heap) and heap[i][0] == date:
+                if heap[i][-1] is not None:
+                    tied.append(heap[i])
+                stack.append(2 * i + 1)
+                stack.append(2 * i + 2)
+        tied.sort()
+        return tied
+
+    def next_active_node(self):
+        """
+        Returns the node with the earliest event. If no events are
+        scheduled the exit node is returned.
+        """
+        self.discard_removed()
+        if not self.heap:
+            return self.simulation.nodes[-1]
+        if self.tie_break == 'Random':
+            tied = self.tied_entries()
+            if len(tied) > 1:
+                return random_choice([entry[-1] for entry in tied],
+                    rng=self.simulation.find_rng('TieBreak', 'Events'))
+        return self.heap[0][-1]
+
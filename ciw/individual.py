@@ -1,18 +1,29 @@
 from __future__ import division
 
+nan = float('nan')
+
+
 class Individual(object):
     """
-    Class for an individual
+    Class for an individual. Dates and times that are not yet
+    known are NaN, queue sizes -1, and destination and server None.
     """
+    __slots__ = ['arrival_date', 'service_start_date', 'service_time',
+                 'service_end_date', 'exit_date', 'id_number',
+                 'data_records', 'customer_class', 'previous_class',
+                 'priority_class', 'prev_priority_class', 'is_blocked',
+                 'server', 'queue_size_at_arrival',
+                 'queue_size_at_departure', 'destination']
+
     def __init__(self, id_number, customer_class=0, priority_class=0):
         """
         Initialise an individual
         """
-        self.arrival_date = False
-        self.service_start_date = False
-        self.service_time = False
-        self.service_end_date = False
-        self.exit_date = False
+        self.arrival_date = nan
+        self.service_start_date = nan
+        self.service_time = nan
+        self.service_end_date = nan
+        self.exit_date = nan
         self.id_number = id_number
         self.data_records = []
         self.customer_class = customer_class
@@ -20,10 +31,10 @@ class Individual(object):
         self.priority_class = priority_class
         self.prev_priority_class = priority_class
         self.is_blocked = False
-        self.server = False
-        self.queue_size_at_arrival = False
-        self.queue_size_at_departure = False
-        self.destination = False
+        self.server = None
+        self.queue_size_at_arrival = -1
+        self.queue_size_at_departure = -1
+        self.destination = None
 
     def __repr__(self):
         """
@@ -1,12 +1,15 @@
 from __future__ import division
 from random import random
+from heapq import heappush, heappop
+from collections import deque, OrderedDict
 import os
 from csv import writer
 
 import networkx as nx
 
-from .auxiliary import random_choice
+from .auxiliary import random_choice, WeightedChoice
 from .data_record import DataRecord
+from .individual import nan
 from .server import Server
 
 
@@ -21,7 +24,8 @@ class Node(object):
         self.simulation = simulation
         node = self.simulation.network.service_centres[id_ - 1]
         if node.schedule:
-            raw_schedule = node.schedule
+            raw_schedule = [[self.convert_date(row[0]), row[1]]
+                for row in node.schedule]
             self.cyclelength = self.increment_time(0, raw_schedule[-1][0])
             boundaries = [0] + [row[0] for row in raw_schedule[:-1]]
             servers = [row[1] for row in raw_schedule]
@@ -40,8 +44,17 @@ class Node(object):
             cls].transition_matrix[id_ - 1] for cls in range(
             self.simulation.network.number_of_classes)]
         self.class_change = node.class_change_matrix
+        if self.class_change:
+            self.class_change_choices = [WeightedChoice(
+                range(len(self.class_change)), row,
+                self.simulation.find_rng('ClassChange', id_, cls))
+                for cls, row in enumerate(self.class_change)]
         self.individuals = [[] for _ in
                 range(simulation.number_of_priority_classes)]
+        self.blocked_individuals = {}
+        self.completions = []
+        self.completion_entries = {}
+        self.completion_sequence = 0
         self.id_number = id_
         self.baulking_functions = [self.simulation.network.customer_classes[
             cls].baulking_functions[id_-1] for cls in range(
@@ -52,21 +65,61 @@ class Node(object):
             self.next_event_date = float("Inf")
         self.blocked_queue = []
         if self.c < float('Inf'):
-            self.servers = [Server(self, i + 1) for i in range(self.c)]
+            self.servers_by_id = OrderedDict()
+            self.server_list = None
+            self.idle_servers = []
+            self.idle_server_ids = set()
+            for i in range(self.c):
+                self.add_server(i + 1)
         self.highest_id = self.c
         self.simulation.deadlock_detector.initialise_at_node(self)
+        self.simulation.time_averages.initialise_at_node(self)
         self.preempt = node.preempt
         self.interrupted_individuals = []
 
+    @property
+    def next_event_date(self):
+        return self._next_event_date
+
+    @next_event_date.setter
+    def next_event_date(self, date):
+        self._next_event_date = date
+        self.simulation.event_list.schedule(self, date)
+
+    @property
+    def individuals(self):
+        return self._individuals
+
+    @individuals.setter
+    def individuals(self, individuals):
+        """
+        Sets the customers at the node, by priority class, and
+        recounts them. Those without a server wait for one.
+        """
+        self._individuals = individuals
+        self.number_of_individuals = sum(len(p) for p in individuals)
+        self.number_in_priority_class = [len(p) for p in individuals]
+        self.waiting_individuals = [deque(ind for ind in p
+            if getattr(ind, 'server', None) is None) for p in individuals]
+
     @property
     def all_individuals(self):
         return [i for priority_class in self.individuals
                 for i in priority_class]
 
     @property
-    def number_of_individuals(self):
-        return len(self.all_individuals)
+    def servers(self):
+        """
+        The node's servers in order of id number. The list is
+        cached, and replaced when a server is added or killed.
+        """
+        if self.server_list is None:
+            self.server_list = list(self.servers_by_id.values())
+        return self.server_list
 
+    @property
+    def number_in_service(self):
+        return len(self.completion_entries)
 
     def __repr__(self):
         """
@@ -78,12 +131,17 @@ class Node(object):
         """
         Accepts a new customer to the queue.
         """
-        next_individual.exit_date = False
+        next_individual.exit_date = nan
         next_individual.is_blocked = False
+        self.simulation.mark_changed(self)
         self.begin_service_if_possible_accept(
             next_individual, current_time)
         next_individual.queue_size_at_arrival = self.number_of_individuals
         self.individuals[next_individual.priority_class].append(next_individual)
+        self.number_of_individuals += 1
+        self.number_in_priority_class[next_individual.priority_class] += 1
+        self.simulation.time_averages.action_at_accept(
+            self, next_individual, current_time)
         self.simulation.statetracker.change_state_accept(
             self.id_number, next_individual.customer_class)
 
@@ -94,7 +152,16 @@ class Node(object):
         num_servers = self.schedule[shift_indx][1]
         for i in range(num_servers):
             self.highest_id += 1
-            self.servers.append(Server(self, self.highest_id))
+            self.add_server(self.highest_id)
+
+    def add_server(self, id_number):
+        """
+        Creates a new server and adds it to the pool of idle servers.
+        """
+        srvr = Server(self, id_number)
+        self.servers_by_id[id_number] = srvr
+        self.server_list = None
+        self.make_server_idle(srvr)
 
     def attach_server(self, server, individual):
         """
@@ -105,6 +172,8 @@ class Node(object):
         individual.server = server
         self.simulation.deadlock_detector.action_at_attach_server(
             self, server, individual)
+        self.simulation.time_averages.action_at_attach_server(
+            self, individual, self.simulation.current_time)
 
     def begin_service_if_possible_accept(self,
                                          next_individual,
@@ -123,6 +192,10 @@ class Node(object):
             next_individual.service_start_date = self.get_now(current_time)
             next_individual.service_end_date = self.increment_time(
                 current_time, next_individual.service_time)
+            self.schedule_completion(next_individual)
+        else:
+            self.waiting_individuals[next_individual.priority_class].append(
+                next_individual)
 
     def begin_interrupted_individuals_service(self, current_time, srvr):
         """
@@ -135,23 +208,37 @@ class Node(object):
                                                  current_time)
         ind.service_end_date = self.increment_time(self.get_now(current_time),
                                                    ind.service_time)
+        self.schedule_completion(ind)
         self.interrupted_individuals.remove(ind)
 
+    def begin_waiting_individuals_service(self, current_time, srvr):
+        """
+        Begins the service of the longest waiting individual of the
+        highest priority, if anyone is waiting.
+        """
+        for waiting in self.waiting_individuals:
+            if waiting:
+                ind = waiting.popleft()
+                self.attach_server(srvr, ind)
+                ind.service_start_date = self.get_now(current_time)
+                ind.service_end_date = self.increment_time(
+                    ind.service_start_date, ind.service_time)
+                self.schedule_completion(ind)
+                return
+
     def begin_service_if_possible_change_shift(self, current_time):
         """
         Attempts to begin service if change_shift
         yields any free servers.
         """
-        free_servers = [s for s in self.servers if not s.busy]
-        for srvr in free_servers:
+        while self.free_server():
+            srvr = self.find_free_server()
             if len(self.interrupted_individuals) > 0:
                 self.begin_interrupted_individuals_service(current_time, srvr)
-            elif len([i for i in self.all_individuals if not i.server]) > 0:
-                ind = [i for i in self.all_individuals if not i.server][0]
-                self.attach_server(srvr, ind)
-                ind.service_start_date = self.get_now(current_time)
-                ind.service_end_date = self.increment_time(
-                    ind.service_start_date, ind.service_time)
+            elif any(self.waiting_individuals):
+                self.begin_waiting_individuals_service(current_time, srvr)
+            else:
+                break
 
     def begin_service_if_possible_release(self, current_time):
         """
@@ -162,26 +249,36 @@ class Node(object):
             srvr = self.find_free_server()
             if len(self.interrupted_individuals) > 0:
                 self.begin_interrupted_individuals_service(current_time, srvr)
-            elif len([i for i in self.all_individuals if not i.server]) > 0:
-                ind = [i for i in self.all_individuals if not i.server][0]
-                self.attach_server(srvr, ind)
-                ind.service_start_date = self.get_now(current_time)
-                ind.service_end_date = self.increment_time(
-                    ind.service_start_date, ind.service_time)
+            else:
+                self.begin_waiting_individuals_service(current_time, srvr)
 
     def block_individual(self, individual, next_node):
         """
         Blocks the individual from entering the next node.
         """
         individual.is_blocked = True
+        self.cancel_completion(individual)
+        self.simulation.time_averages.action_at_blockage(
+            self, individual, self.simulation.current_time)
+        self.simulation.mark_changed(self)
         self.simulation.statetracker.change_state_block(
             self.id_number, next_node.id_number,
             individual.customer_class)
         next_node.blocked_queue.append(
             (self.id_number, individual.id_number))
+        self.blocked_individuals[individual.id_number] = individual
         self.simulation.deadlock_detector.action_at_blockage(
             individual, next_node)
 
+    def cancel_completion(self, individual):
+        """
+        Removes the individual's pending service completion
+        from the completion index.
+        """
+        entry = self.completion_entries.pop(individual, None)
+        if entry is not None:
+            entry[-1] = None
+
     def change_customer_class(self,individual):
         """
         Takes individual and changes customer class
@@ -189,9 +286,8 @@ class Node(object):
         """
         if self.class_change:
             individual.previous_class = individual.customer_class
-            individual.customer_class = random_choice(
-                range(len(self.class_change)),
-                self.class_change[individual.previous_class])
+            individual.customer_class = self.class_change_choices[
+                individual.previous_class].choose()
             individual.prev_priority_class = individual.priority_class
             individual.priority_class = self.simulation.network.priority_class_mapping[individual.customer_class]
 
@@ -229,13 +325,29 @@ class Node(object):
         """
         Detatches a server from an individual, and vice versa
         """
-        server.cust = False
+        server.cust = None
         server.busy = False
-        individual.server = False
+        individual.server = None
+        self.simulation.time_averages.action_at_detach_server(
+            self, individual.previous_class, self.simulation.current_time)
         self.simulation.deadlock_detector.action_at_detach_server(
             server)
         if server.offduty:
             self.kill_server(server)
+        else:
+            self.make_server_idle(server)
+
+    def discard_unavailable_servers(self):
+        """
+        Pops servers that have since become busy or been
+        killed from the top of the idle server heap.
+        """
+        while self.idle_servers:
+            id_number, srvr = self.idle_servers[0]
+            if not srvr.busy and self.servers_by_id.get(id_number) is srvr:
+                return
+            heappop(self.idle_servers)
+            self.idle_server_ids.discard(id_number)
 
     def free_server(self):
         """
@@ -243,43 +355,63 @@ class Node(object):
         """
         if self.c == float('Inf'):
             return True
-        return len([svr for svr in self.servers if not svr.busy]) > 0
+        self.discard_unavailable_servers()
+        return len(self.idle_servers) > 0
 
     def find_free_server(self):
         """
-        Finds a free server.
+        Finds the free server with the lowest id number.
         """
-        for svr in self.servers:
-            if not svr.busy:
-                return svr
+        self.discard_unavailable_servers()
+        if self.idle_servers:
+            return self.idle_servers[0][1]
 
     def find_next_individual(self):
         """
-        Finds the next individual that should now finish service
-        """
-        next_individual_indices = [i for i, x in enumerate(
-            [ind.service_end_date for ind in self.all_individuals]
-            ) if x == self.next_event_date]
-        if len(next_individual_indices) > 1:
-            next_individual_index = random_choice(next_individual_indices)
+        Finds the next individual that should now finish service,
+        and removes them from the completion index. Simultaneous
+        completions are ordered by when their service was scheduled.
+        """
+        self.discard_removed_completions()
+        if self.simulation.event_list.tie_break == 'Random':
+            tied = self.tied_completions(self.next_event_date)
+            if len(tied) > 1:
+                tied.sort(key=lambda entry: entry[1])
+                next_individual = random_choice(tied,
+                    rng=self.simulation.find_rng('TieBreak', self.id_number))[-1]
+            else:
+                next_individual = tied[0][-1]
         else:
-            next_individual_index = next_individual_indices[0]
-        return self.all_individuals[next_individual_index], next_individual_index
+            next_individual = self.completions[0][-1]
+        self.cancel_completion(next_individual)
+        return next_individual
 
     def finish_service(self):
         """
         The next individual finishes service
         """
-        next_individual, next_individual_index = self.find_next_individual()
+        next_individual = self.find_next_individual()
         self.change_customer_class(next_individual)
         next_node = self.next_node(next_individual.customer_class)
         next_individual.destination = next_node.id_number
-        if len(next_node.all_individuals) < next_node.node_capacity:
-            self.release(next_individual_index, next_node,
+        if next_node.number_of_individuals < next_node.node_capacity:
+            self.release(next_individual, next_node,
                 self.next_event_date)
         else:
             self.block_individual(next_individual, next_node)
 
+    def discard_removed_completions(self, current_time=None):
+        """
+        Pops removed entries from the top of the completion index,
+        along with any completions dated before the current time.
+        """
+        completions = self.completions
+        while completions and (completions[0][-1] is None or (
+            current_time is not None and completions[0][0] < current_time)):
+            entry = heappop(completions)
+            if entry[-1] is not None:
+                del self.completion_entries[entry[-1]]
+
     def get_now(self, current_time):
         """
         Gets the current time
@@ -290,6 +422,7 @@ class Node(object):
         """
         Has an event
         """
+        self.simulation.mark_changed(self)
         if self.check_if_shiftchange():
             self.change_shift()
         else:
@@ -305,25 +438,53 @@ class Node(object):
         """
         Kills server.
         """
-        indx = self.servers.index(srvr)
-        del self.servers[indx]
+        if srvr.busy:
+            self.simulation.time_averages.action_at_detach_server(
+                self, srvr.cust.customer_class, self.simulation.current_time)
+        del self.servers_by_id[srvr.id_number]
+        self.server_list = None
+
+    def make_server_idle(self, srvr):
+        """
+        Adds the server to the idle server heap, keyed by id number,
+        in O(log c). Entries of servers that become busy or are
+        killed are discarded lazily.
+        """
+        if srvr.id_number not in self.idle_server_ids:
+            self.idle_server_ids.add(srvr.id_number)
+            heappush(self.idle_servers, (srvr.id_number, srvr))
+
+    def find_routing(self):
+        """
+        Precompiles each customer class's transition row, with the
+        probability of leaving the system last, into a weighted
+        choice over the transitive nodes and the exit node.
+        """
+        self.routing = [WeightedChoice(self.simulation.nodes[1:],
+            row + [1.0 - sum(row)],
+            self.simulation.find_rng('Routing', self.id_number, cls))
+            for cls, row in enumerate(self.transition_row)]
 
     def next_node(self, customer_class):
         """
         Finds the next node according the random distribution.
         """
-        return random_choice(self.simulation.nodes[1:],
-            self.transition_row[customer_class] + [1.0 - sum(
-            self.transition_row[customer_class])])
+        return self.routing[customer_class].choose()
 
-    def release(self, next_individual_index, next_node, current_time):
+    def release(self, next_individual, next_node, current_time):
         """
         Update node when an individual is released.
         """
-        next_individual =  self.all_individuals[next_individual_index]
         self.individuals[next_individual.prev_priority_class].remove(next_individual)
-        next_individual.queue_size_at_departure = len(self.all_individuals)
+        self.number_of_individuals -= 1
+        self.number_in_priority_class[next_individual.prev_priority_class] -= 1
+        self.blocked_individuals.pop(next_individual.id_number, None)
+        self.cancel_completion(next_individual)
+        next_individual.queue_size_at_departure = self.number_of_individuals
         next_individual.exit_date = current_time
+        self.simulation.time_averages.action_at_release(
+            self, next_individual, current_time)
+        self.simulation.mark_changed(self)
         if self.c < float('Inf'):
             self.detatch_server(next_individual.server, next_individual)
         self.write_individual_record(next_individual)
@@ -342,23 +503,30 @@ class Node(object):
         if len(self.blocked_queue) > 0 and self.number_of_individuals < self.node_capacity:
             node_to_receive_from = self.simulation.nodes[
                 self.blocked_queue[0][0]]
-            individual_to_receive_index = [ind.id_number
-                for ind in node_to_receive_from.all_individuals].index(
-                self.blocked_queue[0][1])
-            individual_to_receive = node_to_receive_from.all_individuals[
-                individual_to_receive_index]
+            individual_to_receive = node_to_receive_from.blocked_individuals[
+                self.blocked_queue[0][1]]
             self.blocked_queue.pop(0)
-            node_to_receive_from.release(individual_to_receive_index,
+            node_to_receive_from.release(individual_to_receive,
                 self, current_time)
 
+    def schedule_completion(self, individual):
+        """
+        Adds the individual's service end date to the completion
+        index, replacing any pending completion they already had.
+        """
+        self.cancel_completion(individual)
+        entry = [individual.service_end_date,
+                 self.completion_sequence, individual]
+        self.completion_sequence += 1
+        self.completion_entries[individual] = entry
+        heappush(self.completions, entry)
+
     def get_service_time(self, cls, current_time):
         """
         Returns a service time for the given customer class
         """
-        if self.simulation.network.customer_classes[cls].service_distributions[
-            self.id_number-1][0] == 'TimeDependent':
-            return self.simulation.service_times[self.id_number][cls](current_time)
-        return self.simulation.service_times[self.id_number][cls]()
+        return self.simulation.service_times[self.id_number][cls].sample(
+            current_time)
 
     def take_servers_off_duty(self):
         """
@@ -374,23 +542,42 @@ class Node(object):
         else:
             to_delete = self.servers[::1]  # copy
             for s in self.servers:
-                if s.cust is not False:
+                if s.cust is not None:
                     self.interrupted_individuals.append(s.cust)
-                    self.interrupted_individuals[-1].service_end_date = False
-                    self.interrupted_individuals[-1].service_time = False
+                    self.cancel_completion(s.cust)
+                    self.interrupted_individuals[-1].service_end_date = nan
+                    self.interrupted_individuals[-1].service_time = nan
             self.interrupted_individuals.sort(key=lambda x: (x.priority_class,
                                                              x.arrival_date))
         for obs in to_delete:
             self.kill_server(obs)
 
+    def tied_completions(self, date):
+        """
+        Returns the live completion index entries at the given date.
+        As the heap property holds, these form a subtree containing
+        the root, so only that subtree is visited.
+        """
+        completions = self.completions
+        tied, stack = [], [0]
+        while stack:
+            i = stack.pop()
+            if i < len(completions) and completions[i][0] == date:
+                if completions[i][-1] is not None:
+                    tied.append(completions[i])
+                stack.append(2 * i + 1)
+                stack.append(2 * i + 2)
+        return tied
+
     def update_next_event_date(self, current_time):
         """
         Finds the time of the next event at this node
         """
-        next_end_service = min([ind.service_end_date
-            for ind in self.all_individuals
-            if not ind.is_blocked
-            if ind.service_end_date >= current_time] + [float("Inf")])
+        self.discard_removed_completions(current_time)
+        if self.completions:
+            next_end_service = self.completions[0][0]
+        else:
+            next_end_service = float("Inf")
         if self.schedule:
             next_shift_change = self.next_shift_change
             self.next_event_date = min(
@@ -423,16 +610,25 @@ class Node(object):
                             individual.previous_class,
                             individual.queue_size_at_arrival,
                             individual.queue_size_at_departure)
-        individual.data_records.append(record)
-
-        individual.arrival_date = False
-        individual.service_time = False
-        individual.service_start_date = False
-        individual.service_end_date = False
-        individual.exit_date = False
-        individual.queue_size_at_arrival = False
-        individual.queue_size_at_departure = False
-        individual.destination = False
+        self.simulation.record_sink.write_record(individual, record)
+        self.simulation.warmup_detector.observe_record(record)
+        self.simulation.statistics.observe_record(record)
+        self.simulation.quantiles.observe_record(record)
+
+        individual.arrival_date = nan
+        individual.service_time = nan
+        individual.service_start_date = nan
+        individual.service_end_date = nan
+        individual.exit_date = nan
+        individual.queue_size_at_arrival = -1
+        individual.queue_size_at_departure = -1
+        individual.destination = None
+
+    def convert_date(self, date):
+        """
+        Converts a date given in time units to the node's time
+        """
+        return date
 
     def date_from_schedule_generator(self, boundaries):
         """
@@ -0,0 +1,165 @@
+from __future__ import division
+
+
+class RunningStatistics(object):
+    """
+    Accumulates the count, mean, variance (using Welford's method),
+    minimum and maximum of a stream of observations, without storing
+    the observations. The accumulators take the type of the first
+    observation, so Decimal observations are accumulated exactly.
+    """
+    def __init__(self):
+        """
+        Initialises the empty accumulator
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.sum_squares = 0.0
+        self.min = float('Inf')
+        self.max = float('-Inf')
+
+    def __repr__(self):
+        """
+        Represents the accumulator
+        """
+        return 'Running Statistics (count %s, mean %s)' % (self.count,
+            self.mean)
+
+    def observe(self, value):
+        """
+        Adds an observation.
+        """
+        self.count += 1
+        if self.count == 1:
+            self.mean = self.sum_squares = value * 0
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_squares += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Merges the observations of another accumulator into this
+        one, using Chan's parallel update of the variance.
+        """
+        count = self.count + other.count
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.sum_squares = (
+                other.count, other.mean, other.sum_squares)
+            self.min, self.max = other.min, other.max
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.sum_squares += (other.sum_squares +
+            delta * delta * self.count * other.count / count)
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """
+        The sample variance of the observations.
+        """
+        if self.count < 2:
+            return float('nan')
+        return self.sum_squares / (self.count - 1)
+
+
+class RecordStatistics(object):
+    """
+    Running statistics of the waiting, service, blocking and sojourn
+    (arrival to exit) times at one node of one customer class.
+    """
+    def __init__(self):
+        """
+        Initialises the accumulators
+        """
+        self.waiting_time = RunningStatistics()
+        self.service_time = RunningStatistics()
+        self.time_blocked = RunningStatistics()
+        self.sojourn_time = RunningStatistics()
+
+    def observe_record(self, record):
+        """
+        Adds a data record's times to the accumulators.
+        """
+        self.waiting_time.observe(record.wait)
+        self.service_time.observe(record.service_time)
+        self.time_blocked.observe(record.blocked)
+        self.sojourn_time.observe(record.exit_date - record.arrival_date)
+
+    def merge(self, other):
+        """
+        Merges the accumulators of another RecordStatistics into these.
+        """
+        self.waiting_time.merge(other.waiting_time)
+        self.service_time.merge(other.service_time)
+        self.time_blocked.merge(other.time_blocked)
+        self.sojourn_time.merge(other.sojourn_time)
+        return self
+
+
+class NoOnlineStatistics(object):
+    """
+    A generic class to accumulate statistics of the data records
+    as they are written. This overall class is equivalent to
+    keeping no online statistics.
+    """
+    def observe_record(self, record):
+        """
+        The action taken when a node writes a data record.
+        """
+        pass
+
+    def reset(self):
+        """
+        The action taken when the warm-up period is discarded.
+        """
+        pass
+
+
+class OnlineStatistics(NoOnlineStatistics):
+    """
+    Keeps RecordStatistics for each node and customer class, indexed
+    as statistics[node][customer_class], fed with each data record
+    as it is written.
+    """
+    def __init__(self, number_of_nodes, number_of_classes):
+        """
+        Initialises the statistics of each node and class
+        """
+        self.number_of_nodes = number_of_nodes
+        self.number_of_classes = number_of_classes
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the statistics of each node and class.
+        """
+        self.node_statistics = {nd + 1: {cls: RecordStatistics()
+            for cls in range(self.number_of_classes)}
+            for nd in range(self.number_of_nodes)}
+
+    def __getitem__(self, node):
+        return self.node_statistics[node]
+
+    def observe_record(self, record):
+        self.node_statistics[record.node][
+            record.customer_class].observe_record(record)
+
+    def merge(self, other):
+        """
+        Merges the statistics of another simulation of the same
+        network, such as another replication, into these.
+        """
+        for node, classes in other.node_statistics.items():
+            for cls, statistics in classes.items():
+                self.node_statistics[node][cls].merge(statistics)
+        return self
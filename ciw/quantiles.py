@@ -0,0 +1,217 @@
+from __future__ import division
+from math import asin, pi, sin
+
+__all__ = ['TDigest', 'RecordQuantiles', 'NoQuantileSketches',
+           'QuantileSketches']
+
+
+class TDigest(object):
+    """
+    A merging t-digest: a bounded memory sketch of a stream of
+    observations that estimates their quantiles. Observations are
+    buffered, then merged into weighted centroids, kept small near
+    the extreme quantiles so the tails are estimated most accurately.
+    The number of centroids is bounded by about the compression. The
+    sketch is deterministic, and digests of different streams can be
+    merged.
+    """
+    def __init__(self, compression=100):
+        """
+        Initialises the empty digest
+        """
+        if compression <= 0:
+            raise ValueError("'compression' must be positive.")
+        self.compression = compression
+        self.buffer_size = int(5 * compression)
+        self.centroids = []
+        self.buffer = []
+        self.count = 0
+        self.min = float('Inf')
+        self.max = float('-Inf')
+
+    def __repr__(self):
+        """
+        Represents the digest
+        """
+        return 'TDigest (count %s)' % self.count
+
+    def observe(self, value, weight=1):
+        """
+        Adds an observation, with the given weight.
+        """
+        value = float(value)
+        self.buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self.buffer) >= self.buffer_size:
+            self.compress()
+
+    def merge(self, other):
+        """
+        Merges the observations of another digest into this one.
+        """
+        self.buffer.extend(other.centroids)
+        self.buffer.extend(other.buffer)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+        return self
+
+    def quantile_limit(self, q):
+        """
+        The largest quantile that a centroid starting at quantile q
+        may reach, under the arcsine scale function.
+        """
+        k = self.compression * asin(2 * q - 1) / (2 * pi) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (sin(2 * pi * k / self.compression) + 1) / 2
+
+    def compress(self):
+        """
+        Merges the buffer into the centroids.
+        """
+        if not self.buffer:
+            return
+        points = sorted(self.centroids + self.buffer)
+        self.buffer = []
+        total = sum(weight for _, weight in points)
+        centroids = []
+        mean, weight = points[0]
+        so_far = 0
+        limit = total * self.quantile_limit(0.0)
+        for next_mean, next_weight in points[1:]:
+            if so_far + weight + next_weight <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                centroids.append((mean, weight))
+                so_far += weight
+                limit = total * self.quantile_limit(so_far / total)
+                mean, weight = next_mean, next_weight
+        centroids.append((mean, weight))
+        self.centroids = centroids
+
+    def quantile(self, q):
+        """
+        Estimates the q quantile of the observations, interpolating
+        between the centres of the centroids.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("'q' must be between 0 and 1.")
+        if self.count == 0:
+            return float('nan')
+        self.compress()
+        target = q * self.count
+        previous_centre, previous_mean = 0, self.min
+        cumulative = 0
+        for mean, weight in self.centroids:
+            centre = cumulative + weight / 2
+            if target < centre:
+                return self.interpolate(target, previous_centre, centre,
+                                        previous_mean, mean)
+            cumulative += weight
+            previous_centre, previous_mean = centre, mean
+        return self.interpolate(target, previous_centre, self.count,
+                                previous_mean, self.max)
+
+    def interpolate(self, target, lower, upper, lower_value, upper_value):
+        """
+        Linearly interpolates the value at the target cumulative weight.
+        """
+        if upper == lower:
+            return upper_value
+        return lower_value + ((target - lower) / (upper - lower)
+                              * (upper_value - lower_value))
+
+
+class RecordQuantiles(object):
+    """
+    Quantile sketches of the waiting and sojourn (arrival to exit)
+    times at one node of one customer class.
+    """
+    def __init__(self, compression=100):
+        """
+        Initialises the sketches
+        """
+        self.waiting_time = TDigest(compression)
+        self.sojourn_time = TDigest(compression)
+
+    def observe_record(self, record):
+        """
+        Adds a data record's times to the sketches.
+        """
+        self.waiting_time.observe(record.wait)
+        self.sojourn_time.observe(record.exit_date - record.arrival_date)
+
+    def merge(self, other):
+        """
+        Merges the sketches of another RecordQuantiles into these.
+        """
+        self.waiting_time.merge(other.waiting_time)
+        self.sojourn_time.merge(other.sojourn_time)
+        return self
+
+
+class NoQuantileSketches(object):
+    """
+    A generic class to sketch the quantiles of the data records as
+    they are written. This overall class is equivalent to keeping
+    no quantile sketches.
+    """
+    def observe_record(self, record):
+        """
+        The action taken when a node writes a data record.
+        """
+        pass
+
+    def reset(self):
+        """
+        The action taken when the warm-up period is discarded.
+        """
+        pass
+
+
+class QuantileSketches(NoQuantileSketches):
+    """
+    Keeps RecordQuantiles for each node and customer class, indexed
+    as quantiles[node][customer_class], fed with each data record as
+    it is written.
+    """
+    def __init__(self, number_of_nodes, number_of_classes, compression=100):
+        """
+        Initialises the sketches of each node and class
+        """
+        self.number_of_nodes = number_of_nodes
+        self.number_of_classes = number_of_classes
+        self.compression = compression
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the sketches of each node and class.
+        """
+        self.node_quantiles = {nd + 1: {cls: RecordQuantiles(
+            self.compression) for cls in range(self.number_of_classes)}
+            for nd in range(self.number_of_nodes)}
+
+    def __getitem__(self, node):
+        return self.node_quantiles[node]
+
+    def observe_record(self, record):
+        self.node_quantiles[record.node][
+            record.customer_class].observe_record(record)
+
+    def merge(self, other):
+        """
+        Merges the sketches of another simulation of the same
+        network, such as another replication, into these.
+        """
+        for node, classes in other.node_quantiles.items():
+            for cls, quantiles in classes.items():
+                self.node_quantiles[node][cls].merge(quantiles)
+        return self
@@ -0,0 +1,303 @@
+from __future__ import division
+from array import array
+from collections import namedtuple
+from csv import writer
+import gzip
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['Record', 'record_headers', 'make_record', 'RecordSink',
+           'CSVSink', 'GzipCSVSink', 'BinarySink', 'ColumnarSink',
+           'read_binary_records']
+
+Record = namedtuple('Record', 'id_number customer_class node arrival_date waiting_time service_start_date service_time service_end_date time_blocked exit_date destination queue_size_at_arrival queue_size_at_departure')
+
+record_typecodes = 'qqqdddddddqqq'
+
+record_headers = ['I.D. Number',
+                  'Customer Class',
+                  'Node',
+                  'Arrival Date',
+                  'Waiting Time',
+                  'Service Start Date',
+                  'Service Time',
+                  'Service End Date',
+                  'Time Blocked',
+                  'Exit Date',
+                  'Destination',
+                  'Queue Size at Arrival',
+                  'Queue Size at Departure']
+
+
+def make_record(individual, record):
+    """
+    Returns the Record of an individual's data record
+    """
+    return Record(individual.id_number,
+                  record.customer_class,
+                  record.node,
+                  record.arrival_date,
+                  record.wait,
+                  record.service_start_date,
+                  record.service_time,
+                  record.service_end_date,
+                  record.blocked,
+                  record.exit_date,
+                  record.destination,
+                  record.queue_size_at_arrival,
+                  record.queue_size_at_departure)
+
+
+class RecordSink(object):
+    """
+    A generic class that receives each data record as it is
+    written. This overall class keeps the records in memory, on
+    the individuals, and finished individuals are retained by the
+    exit node.
+    """
+    retains_records = True
+
+    def write_record(self, individual, record):
+        """
+        Receives a data record as it is written.
+        """
+        individual.data_records.append(record)
+
+    def get_records(self):
+        """
+        Returns the records held by the sink, or None if the records
+        are kept on the individuals.
+        """
+        return None
+
+    def flush(self):
+        """
+        Flushes any buffered records.
+        """
+        pass
+
+    def close(self):
+        """
+        Flushes and closes the sink.
+        """
+        pass
+
+
+class CSVSink(RecordSink):
+    """
+    Streams the records to a csv file as they are written. The
+    records are not kept in memory, and finished individuals are
+    not retained.
+    """
+    retains_records = False
+
+    def __init__(self, file_name, headers=True):
+        """
+        Opens the csv file
+        """
+        self.file_name = os.path.join(os.getcwd(), file_name)
+        self.data_file = self.open_file()
+        self.csv_wrtr = writer(self.data_file)
+        if headers:
+            self.csv_wrtr.writerow(record_headers)
+
+    def open_file(self):
+        return open(self.file_name, 'w')
+
+    def write_record(self, individual, record):
+        self.csv_wrtr.writerow(make_record(individual, record))
+
+    def flush(self):
+        self.data_file.flush()
+
+    def close(self):
+        if not self.data_file.closed:
+            self.data_file.close()
+
+
+class GzipCSVSink(CSVSink):
+    """
+    Streams the records to a gzip compressed csv file.
+    """
+    def open_file(self):
+        return gzip.open(self.file_name, 'wt')
+
+
+class BinarySink(RecordSink):
+    """
+    Streams the records to a binary file in chunks. The file begins
+    with the magic bytes, then each chunk is the number of records
+    it contains followed by the records, each packed with
+    record_struct. Read the file back with read_binary_records.
+    """
+    retains_records = False
+    magic = b'CIWREC1\n'
+    record_struct = struct.Struct('<' + record_typecodes)
+    count_struct = struct.Struct('<I')
+
+    def __init__(self, file_name, chunk_size=4096):
+        """
+        Opens the binary file
+        """
+        if chunk_size < 1:
+            raise ValueError("'chunk_size' must be a positive integer.")
+        self.file_name = os.path.join(os.getcwd(), file_name)
+        self.chunk_size = chunk_size
+        self.chunk = []
+        self.data_file = open(self.file_name, 'wb')
+        self.data_file.write(self.magic)
+
+    def write_record(self, individual, record):
+        self.chunk.append(self.record_struct.pack(
+            individual.id_number,
+            record.customer_class,
+            record.node,
+            record.arrival_date,
+            record.wait,
+            record.service_start_date,
+            record.service_time,
+            record.service_end_date,
+            record.blocked,
+            record.exit_date,
+            record.destination,
+            record.queue_size_at_arrival,
+            record.queue_size_at_departure))
+        if len(self.chunk) == self.chunk_size:
+            self.write_chunk()
+
+    def write_chunk(self):
+        """
+        Writes the buffered records as one chunk.
+        """
+        if self.chunk:
+            self.data_file.write(self.count_struct.pack(len(self.chunk)))
+            self.data_file.write(b''.join(self.chunk))
+            self.chunk = []
+
+    def flush(self):
+        self.write_chunk()
+        self.data_file.flush()
+
+    def close(self):
+        if not self.data_file.closed:
+            self.write_chunk()
+            self.data_file.close()
+
+
+class ColumnarSink(RecordSink):
+    """
+    Stores the records in memory as typed columns, one array per
+    Record field: floats for dates and times, integers for the rest.
+    The columns are stored in chunks of at most chunk_size records,
+    so that they can be exported as NumPy arrays without copying: a
+    chunk is never written to once it is full, or once exported.
+    """
+    retains_records = False
+
+    def __init__(self, chunk_size=65536):
+        """
+        Initialises the empty columns
+        """
+        if chunk_size < 1:
+            raise ValueError("'chunk_size' must be a positive integer.")
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.number_of_records = 0
+        self.new_chunk()
+
+    def __len__(self):
+        return self.number_of_records
+
+    def new_chunk(self):
+        """
+        Begins a new chunk of empty columns.
+        """
+        self.column_list = [array(typecode) for typecode in record_typecodes]
+        self.chunks.append(self.column_list)
+        self.chunk_length = 0
+        self.exported = False
+
+    def write_record(self, individual, record):
+        if self.exported or self.chunk_length == self.chunk_size:
+            self.new_chunk()
+        c = self.column_list
+        c[0].append(individual.id_number)
+        c[1].append(record.customer_class)
+        c[2].append(record.node)
+        c[3].append(record.arrival_date)
+        c[4].append(record.wait)
+        c[5].append(record.service_start_date)
+        c[6].append(record.service_time)
+        c[7].append(record.service_end_date)
+        c[8].append(record.blocked)
+        c[9].append(record.exit_date)
+        c[10].append(record.destination)
+        c[11].append(record.queue_size_at_arrival)
+        c[12].append(record.queue_size_at_departure)
+        self.chunk_length += 1
+        self.number_of_records += 1
+
+    def column_chunks(self, field):
+        """
+        Returns the chunks of the column of the given Record field.
+        """
+        i = Record._fields.index(field)
+        return [chunk[i] for chunk in self.chunks]
+
+    def get_records(self):
+        """
+        Returns the records as a list of Records, in the order
+        they were written.
+        """
+        return [Record(*fields) for chunk in self.chunks
+                for fields in zip(*chunk)]
+
+    def to_numpy_chunks(self):
+        """
+        Returns a dictionary of lists of NumPy arrays, one array per
+        chunk for each Record field, that share memory with the
+        columns.
+        """
+        if np is None:
+            raise ImportError("Exporting columns requires numpy.")
+        self.exported = True
+        return {field: [np.frombuffer(chunk[i], dtype=chunk[i].typecode)
+                        for chunk in self.chunks]
+                for i, field in enumerate(Record._fields)}
+
+    def to_numpy(self):
+        """
+        Returns a dictionary of NumPy arrays, one for each Record
+        field. While the records fit in one chunk these share memory
+        with the columns; otherwise the chunks are concatenated into
+        new arrays.
+        """
+        columns = self.to_numpy_chunks()
+        if len(self.chunks) == 1:
+            return {field: arrays[0] for field, arrays in columns.items()}
+        return {field: np.concatenate(arrays)
+                for field, arrays in columns.items()}
+
+
+def read_binary_records(file_name):
+    """
+    Yields the Records of a file written by a BinarySink.
+    """
+    record_struct = BinarySink.record_struct
+    count_struct = BinarySink.count_struct
+    with open(os.path.join(os.getcwd(), file_name), 'rb') as data_file:
+        if data_file.read(len(BinarySink.magic)) != BinarySink.magic:
+            raise ValueError("Not a Ciw binary records file.")
+        while True:
+            count = data_file.read(count_struct.size)
+            if not count:
+                break
+            n = count_struct.unpack(count)[0]
+            data = data_file.read(n * record_struct.size)
+            for fields in record_struct.iter_unpack(data):
+                yield Record(*fields)
@@ -0,0 +1,201 @@
+from __future__ import division
+from collections import namedtuple
+from copy import deepcopy
+from decimal import Decimal
+from math import exp, lgamma, log, sqrt
+from numbers import Real
+import multiprocessing
+
+from . import auxiliary
+from .import_params import create_network
+from .network import Network
+from .simulation import Simulation
+
+__all__ = ['Statistics', 'ReplicationResults', 'summarise_records',
+           'student_t_quantile', 'aggregate', 'run_replications']
+
+Statistics = namedtuple('Statistics', 'mean variance confidence_interval')
+ReplicationResults = namedtuple('ReplicationResults', 'summaries statistics')
+
+_worker_spec = {}
+
+
+def summarise_records(Q, warmup=0.0):
+    """
+    Returns a compact summary of a finished simulation: the number
+    of records, and mean waiting, service and blocking times, of
+    customers arriving after the warmup time. The warmup is given in
+    time units, and the means are in the simulation's own units, so
+    in ticks if it counts time in ticks.
+    """
+    if Q.ticks_per_unit is not None:
+        warmup = Q.to_ticks(warmup)
+    recs = [r for r in Q.get_all_records() if r.arrival_date > warmup]
+    n = len(recs)
+    mean = lambda values: sum(values) / n if n > 0 else float('nan')
+    return {'number_of_records': n,
+            'mean_waiting_time': mean([r.waiting_time for r in recs]),
+            'mean_service_time': mean([r.service_time for r in recs]),
+            'mean_time_blocked': mean([r.time_blocked for r in recs])}
+
+
+def beta_continued_fraction(x, a, b):
+    """
+    Evaluates the continued fraction of the incomplete beta
+    function by the modified Lentz method.
+    """
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        for numerator in [m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x /
+                          ((a + 2 * m) * (a + 2 * m + 1))]:
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1e-15:
+            break
+    return fraction
+
+
+def incomplete_beta(x, a, b):
+    """
+    Returns the regularised incomplete beta function I_x(a, b).
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = exp(lgamma(a + b) - lgamma(a) - lgamma(b)
+                + a * log(x) + b * log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * beta_continued_fraction(x, a, b) / a
+    return 1.0 - front * beta_continued_fraction(1 - x, b, a) / b
+
+
+def student_t_quantile(p, degrees_of_freedom):
+    """
+    Returns the p quantile of Student's t distribution with the
+    given degrees of freedom, found by bisection.
+    """
+    if degrees_of_freedom < 1:
+        return float('nan')
+    cdf = lambda t: 1 - 0.5 * incomplete_beta(
+        degrees_of_freedom / (degrees_of_freedom + t * t),
+        degrees_of_freedom / 2, 0.5)
+    if p < 0.5:
+        return -student_t_quantile(1 - p, degrees_of_freedom)
+    lower, upper = 0.0, 1.0
+    while cdf(upper) < p:
+        lower, upper = upper, 2 * upper
+    for _ in range(100):
+        middle = (lower + upper) / 2
+        if cdf(middle) < p:
+            lower = middle
+        else:
+            upper = middle
+    return (lower + upper) / 2
+
+
+def aggregate(summaries, confidence=0.95):
+    """
+    Aggregates the replications' summaries, in replication order.
+    Numeric values, including Decimals, give the mean, sample
+    variance and Student t confidence interval of the mean of each
+    summarised value, as floats. Values with a merge method, such as
+    quantile sketches or online statistics, are merged into a copy
+    of the first replication's; any other values raise an error.
+    """
+    n = len(summaries)
+    t = student_t_quantile(1 - (1 - confidence) / 2, n - 1)
+    statistics = {}
+    for key in summaries[0]:
+        values = [summary[key] for summary in summaries]
+        if hasattr(values[0], 'merge'):
+            merged = deepcopy(values[0])
+            for value in values[1:]:
+                merged.merge(value)
+            statistics[key] = merged
+            continue
+        if not all(isinstance(v, (Real, Decimal)) for v in values):
+            raise ValueError(
+                "Summarised value '%s' is neither numeric nor mergeable." % key)
+        values = [float(v) for v in values]
+        mean = sum(values) / n
+        if n > 1:
+            variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+        else:
+            variance = float('nan')
+        half_width = t * sqrt(variance / n)
+        statistics[key] = Statistics(mean, variance,
+            (mean - half_width, mean + half_width))
+    return statistics
+
+
+def initialise_worker(spec):
+    """
+    Stores the run specification in a worker process.
+    """
+    _worker_spec.clear()
+    _worker_spec.update(spec)
+
+
+def run_replication(replication_seed):
+    """
+    Runs one replication of the stored run specification with the
+    given seed, and returns its summary.
+    """
+    spec = _worker_spec
+    auxiliary.seed(replication_seed)
+    Q = Simulation(spec['network'], **spec['simulation_kwargs'])
+    if spec['max_time'] is not None:
+        Q.simulate_until_max_time(spec['max_time'])
+    else:
+        Q.simulate_until_max_customers(spec['max_customers'])
+    return spec['summarise'](Q, spec['warmup'])
+
+
+def run_replications(network, number_of_replications,
+                     max_time=None, max_customers=None,
+                     warmup=0.0, seed=0, processes=None,
+                     summarise=summarise_records, confidence=0.95,
+                     **simulation_kwargs):
+    """
+    Runs independent replications of a simulation over a pool of
+    processes. Replication r is seeded with seed + r, so the results
+    are reproducible and do not depend on the number of processes.
+    Each replication returns only the compact summary given by
+    summarise(Q, warmup), and these are aggregated in replication
+    order.
+
+    The run specification is either a max_time or a max_customers;
+    any other keyword arguments are passed to the Simulation.
+    """
+    if (max_time is None) == (max_customers is None):
+        raise ValueError("Give exactly one of 'max_time' and 'max_customers'.")
+    if number_of_replications < 1:
+        raise ValueError("'number_of_replications' must be positive.")
+    if not isinstance(network, Network):
+        network = create_network(network)
+    spec = {'network': network,
+            'max_time': max_time,
+            'max_customers': max_customers,
+            'warmup': warmup,
+            'summarise': summarise,
+            'simulation_kwargs': simulation_kwargs}
+    seeds = [seed + r for r in range(number_of_replications)]
+    if processes == 1:
+        initialise_worker(spec)
+        summaries = [run_replication(s) for s in seeds]
+    else:
+        pool = multiprocessing.Pool(processes, initialise_worker, (spec,))
+        try:
+            summaries = pool.map(run_replication, seeds)
+        finally:
+            pool.close()
+            pool.join()
+    return ReplicationResults(summaries, aggregate(summaries, confidence))
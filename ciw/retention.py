@@ -0,0 +1,92 @@
+from __future__ import division
+import random
+
+from .auxiliary import stream_rng
+
+
+class RetainAll(object):
+    """
+    A generic class to decide which finished individuals, and so
+    which of their records, the exit node keeps. This overall class
+    keeps every finished individual.
+    """
+    def __init__(self):
+        """
+        Initialises the policy
+        """
+        self.individuals = []
+
+    def initialise(self, simulation):
+        """
+        Empties the retained individuals when a simulation begins.
+        """
+        self.individuals = []
+
+    def retain(self, individual):
+        """
+        The action taken when an individual leaves the system.
+        """
+        self.individuals.append(individual)
+
+
+class RetainNone(RetainAll):
+    """
+    Keeps no finished individuals; the exit node only counts them.
+    """
+    def retain(self, individual):
+        pass
+
+
+class ReservoirSample(RetainAll):
+    """
+    Keeps a uniform random sample of size finished individuals,
+    using reservoir sampling. The sample is drawn from its own random
+    number generator, seeded with seed, or derived from the
+    simulation's seed if no seed is given, so that retention does
+    not change the simulation itself.
+    """
+    def __init__(self, size, seed=None):
+        """
+        Initialises the reservoir
+        """
+        if size < 1:
+            raise ValueError("'size' must be a positive integer.")
+        self.size = size
+        self.seed = seed
+        self.individuals = []
+        self.number_seen = 0
+        self.rng = random.Random(seed)
+
+    def initialise(self, simulation):
+        self.individuals = []
+        self.number_seen = 0
+        if self.seed is None:
+            self.rng = stream_rng(simulation.master_seed, 'Retention')
+        else:
+            self.rng = random.Random(self.seed)
+
+    def retain(self, individual):
+        self.number_seen += 1
+        if len(self.individuals) < self.size:
+            self.individuals.append(individual)
+        else:
+            j = self.rng.randrange(self.number_seen)
+            if j < self.size:
+                self.individuals[j] = individual
+
+
+class RetainTagged(RetainAll):
+    """
+    Keeps only the finished individuals for which is_tagged(individual)
+    is True, for example those of a given customer class.
+    """
+    def __init__(self, is_tagged):
+        """
+        Initialises the policy with the tagging function
+        """
+        self.is_tagged = is_tagged
+        self.individuals = []
+
+    def retain(self, individual):
+        if self.is_tagged(individual):
+            self.individuals.append(individual)
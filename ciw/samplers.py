@@ -0,0 +1,273 @@
+from __future__ import division
+import random
+
+from .auxiliary import random_choice, seed_entropy, WeightedChoice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['Sampler', 'NoArrivalsSampler', 'UniformSampler',
+           'DeterministicSampler', 'TriangularSampler', 'ExponentialSampler',
+           'GammaSampler', 'LognormalSampler', 'WeibullSampler',
+           'CustomSampler', 'EmpiricalSampler', 'UserDefinedSampler',
+           'TimeDependentSampler', 'BufferedSampler', 'stream_generator',
+           'find_numpy_sampler']
+
+
+class Sampler(object):
+    """
+    A generic class for sampling from a distribution. The
+    distribution's parameters are bound when the sampler is
+    created, so drawing a sample is a single call to sample(t),
+    where t is the current time, defined by each subclass. Random
+    numbers are drawn from rng, the global random module unless the
+    simulation uses independent streams.
+    """
+    rng = random
+
+    def __call__(self, t=None):
+        """
+        Samples from the distribution.
+        """
+        return self.sample(t)
+
+
+class NoArrivalsSampler(Sampler):
+    """
+    Never samples a finite time.
+    """
+    def sample(self, t=None):
+        return float('Inf')
+
+
+class UniformSampler(Sampler):
+    """
+    Samples from the uniform distribution between lower and upper.
+    """
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+
+    def sample(self, t=None):
+        return self.rng.uniform(self.lower, self.upper)
+
+
+class DeterministicSampler(Sampler):
+    """
+    Always samples the same value.
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def sample(self, t=None):
+        return self.value
+
+
+class TriangularSampler(Sampler):
+    """
+    Samples from the triangular distribution.
+    """
+    def __init__(self, lower, upper, mode):
+        self.lower = lower
+        self.upper = upper
+        self.mode = mode
+
+    def sample(self, t=None):
+        return self.rng.triangular(self.lower, self.upper, self.mode)
+
+
+class ExponentialSampler(Sampler):
+    """
+    Samples from the exponential distribution.
+    """
+    def __init__(self, rate):
+        self.rate = rate
+
+    def sample(self, t=None):
+        return self.rng.expovariate(self.rate)
+
+
+class GammaSampler(Sampler):
+    """
+    Samples from the gamma distribution.
+    """
+    def __init__(self, shape, scale):
+        self.shape = shape
+        self.scale = scale
+
+    def sample(self, t=None):
+        return self.rng.gammavariate(self.shape, self.scale)
+
+
+class LognormalSampler(Sampler):
+    """
+    Samples from the lognormal distribution.
+    """
+    def __init__(self, mean, sd):
+        self.mean = mean
+        self.sd = sd
+
+    def sample(self, t=None):
+        return self.rng.lognormvariate(self.mean, self.sd)
+
+
+class WeibullSampler(Sampler):
+    """
+    Samples from the Weibull distribution.
+    """
+    def __init__(self, scale, shape):
+        self.scale = scale
+        self.shape = shape
+
+    def sample(self, t=None):
+        return self.rng.weibullvariate(self.scale, self.shape)
+
+
+class CustomSampler(Sampler):
+    """
+    Samples from a discrete distribution given as a list
+    of [probability, value] pairs.
+    """
+    def __init__(self, pairs):
+        P, V = zip(*pairs)
+        self.probs, self.values = list(P), list(V)
+        self.choice = WeightedChoice(self.values, self.probs)
+
+    @property
+    def rng(self):
+        return self.choice.rng
+
+    @rng.setter
+    def rng(self, rng):
+        self.choice.rng = rng
+
+    def sample(self, t=None):
+        return self.choice.choose()
+
+
+class EmpiricalSampler(Sampler):
+    """
+    Samples uniformly from a list of observations.
+    """
+    def __init__(self, observations):
+        self.observations = observations
+
+    def sample(self, t=None):
+        return random_choice(self.observations, rng=self.rng)
+
+
+class UserDefinedSampler(Sampler):
+    """
+    Samples from a user defined function of no arguments.
+    """
+    def __init__(self, func):
+        self.func = func
+
+    def sample(self, t=None):
+        sample = self.func()
+        if not isinstance(sample, float) or sample < 0:
+            raise ValueError("UserDefined func must return positive float.")
+        return sample
+
+
+class TimeDependentSampler(Sampler):
+    """
+    Samples from a user defined function of the current time.
+    """
+    def __init__(self, func):
+        self.func = func
+
+    def sample(self, t=None):
+        sample = self.func(t)
+        if not isinstance(sample, float) or sample < 0:
+            raise ValueError("TimeDependent func must return positive float.")
+        return sample
+
+
+dist_samplers = {'Uniform': UniformSampler,
+                 'Deterministic': DeterministicSampler,
+                 'Triangular': TriangularSampler,
+                 'Exponential': ExponentialSampler,
+                 'Gamma': GammaSampler,
+                 'Lognormal': LognormalSampler,
+                 'Weibull': WeibullSampler,
+                 'Custom': CustomSampler,
+                 'Empirical': EmpiricalSampler,
+                 'UserDefined': UserDefinedSampler,
+                 'TimeDependent': TimeDependentSampler}
+
+
+class BufferedSampler(Sampler):
+    """
+    Samples from a block of pre-generated variates, drawing a new
+    block with draw_block(block_size) once the current one is used.
+    """
+    def __init__(self, draw_block, block_size=1000):
+        if block_size < 1:
+            raise ValueError("'block_size' must be a positive integer.")
+        self.draw_block = draw_block
+        self.block_size = block_size
+        self.buffer = []
+        self.index = 0
+
+    def sample(self, t=None):
+        if self.index == len(self.buffer):
+            self.buffer = self.draw_block(self.block_size).tolist()
+            self.index = 0
+        self.index += 1
+        return self.buffer[self.index - 1]
+
+
+def stream_generator(stream_key):
+    """
+    Returns a NumPy Generator for the given stream, seeded from the
+    last ciw.seed and the stream's key, so that each stream is
+    reproducible and independent of the order streams are created.
+    """
+    if np is None:
+        raise ImportError("The 'numpy' sampling backend requires numpy.")
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(
+        seed_entropy(), spawn_key=stream_key)))
+
+
+def find_numpy_sampler(source, stream_key, block_size=1000):
+    """
+    Returns a block-buffered sampler drawing from the stream's NumPy
+    Generator, or None if the distribution is not sampled in blocks.
+    Every variate is drawn independently of the block boundaries, so
+    the samples do not depend on the block size.
+    """
+    name, params = source[0], source[1:]
+    if name not in numpy_dists:
+        return None
+    generator = stream_generator(stream_key)
+    if name == 'Uniform':
+        draw = lambda size: generator.uniform(params[0], params[1], size)
+    elif name == 'Triangular':
+        draw = lambda size: generator.triangular(
+            params[0], params[2], params[1], size)
+    elif name == 'Exponential':
+        draw = lambda size: generator.exponential(1.0 / params[0], size)
+    elif name == 'Gamma':
+        draw = lambda size: generator.gamma(params[0], params[1], size)
+    elif name == 'Lognormal':
+        draw = lambda size: generator.lognormal(params[0], params[1], size)
+    elif name == 'Weibull':
+        draw = lambda size: params[0] * generator.weibull(params[1], size)
+    elif name == 'Custom':
+        P, V = zip(*params[0])
+        values, cumulative = np.array(V), np.cumsum(P)
+        last = len(values) - 1
+        draw = lambda size: values[np.minimum(np.searchsorted(
+            cumulative, generator.random(size)), last)]
+    elif name == 'Empirical':
+        observations = np.array(params[0])
+        draw = lambda size: observations[(generator.random(size) *
+            len(observations)).astype(int)]
+    return BufferedSampler(draw, block_size)
+
+
+numpy_dists = ['Uniform', 'Triangular', 'Exponential', 'Gamma',
+               'Lognormal', 'Weibull', 'Custom', 'Empirical']
@@ -2,17 +2,21 @@ from __future__ import division
 
 class Server(object):
     """
-    A class to contain server information
+    A class to contain server information. An idle server's
+    customer is None.
     """
+    __slots__ = ['node', 'id_number', 'cust', 'busy', 'offduty', 'vertex']
+
     def __init__(self, node, id_number):
         """
         Initialise the server object
         """
         self.node = node
         self.id_number = id_number
-        self.cust = False
+        self.cust = None
         self.busy = False
         self.offduty = False
+        self.vertex = None
 
     def __repr__(self):
         """
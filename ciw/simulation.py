@@ -1,21 +1,28 @@
 from __future__ import division
 import os
+import random
 import tqdm
-from random import (expovariate, uniform, triangular, gammavariate,
-                    lognormvariate, weibullvariate)
 from csv import writer, reader
 from decimal import getcontext
-from collections import namedtuple
 
-from .auxiliary import random_choice
+from .auxiliary import seed_entropy, stream_rng
+from .samplers import (dist_samplers, NoArrivalsSampler, UserDefinedSampler,
+                       TimeDependentSampler, find_numpy_sampler)
 from .node import Node
 from .exactnode import ExactNode, ExactArrivalNode
+from .ticknode import TickNode, TickArrivalNode
 from .arrival_node import ArrivalNode
 from .exit_node import ExitNode
+from .future_event_list import FutureEventList
 from .state_tracker import *
 from .deadlock_detector import *
+from .warmup import *
+from .online_statistics import *
+from .time_averages import *
+from .retention import *
+from .quantiles import *
+from .record_sinks import Record, RecordSink, make_record, record_headers
 
-Record = namedtuple('Record', 'id_number customer_class node arrival_date waiting_time service_start_date service_time service_end_date time_blocked exit_date destination queue_size_at_arrival queue_size_at_departure')
 
 class Simulation(object):
     """
@@ -26,19 +33,73 @@ class Simulation(object):
                  name='Simulation',
                  tracker=False,
                  deadlock_detector=False,
-        node_class=None, arrival_node_class=None):
+        node_class=None, arrival_node_class=None,
+                 tie_break='Random',
+                 sampling_backend='random',
+                 block_size=1000,
+                 independent_streams=False,
+                 warmup_detector=False,
+                 record_sink=None,
+                 online_statistics=False,
+                 time_averages=False,
+                 quantile_sketches=False,
+                 retention=None,
+                 ticks_per_unit=None):
         """
         Initialise a queue instance.
         """
         self.network = network
+        self.independent_streams = independent_streams
+        self.master_seed = seed_entropy()
+        if self.master_seed is None:
+            self.master_seed = random.Random().getrandbits(64)
+        self.streams = {}
+        self.event_list = FutureEventList(self, tie_break)
+        self.changed_nodes = {}
         self.set_classes(node_class, arrival_node_class)
+        self.custom_nodes = (node_class is not None or
+                             arrival_node_class is not None)
+        self._deadlock_analysis = None
         if exact:
             self.NodeType = ExactNode
             self.ArrivalNodeType = ExactArrivalNode
             getcontext().prec = exact
+        if ticks_per_unit is not None:
+            if exact:
+                raise ValueError("Choose either 'exact' or 'ticks_per_unit'.")
+            if ticks_per_unit < 1 or int(ticks_per_unit) != ticks_per_unit:
+                raise ValueError("'ticks_per_unit' must be a positive integer.")
+            self.NodeType = TickNode
+            self.ArrivalNodeType = TickArrivalNode
+        self.ticks_per_unit = ticks_per_unit
 
         self.name = name
+        self.current_time = 0
+        if time_averages:
+            self.time_averages = TimeAverages(self)
+        else:
+            self.time_averages = NoTimeAverages()
         self.deadlock_detector = self.choose_deadlock_detection(deadlock_detector)
+        self.warmup_detector = self.choose_warmup_detection(warmup_detector)
+        if record_sink is None:
+            record_sink = RecordSink()
+        self.record_sink = record_sink
+        if online_statistics:
+            self.statistics = OnlineStatistics(network.number_of_nodes,
+                network.number_of_classes)
+        else:
+            self.statistics = NoOnlineStatistics()
+        if quantile_sketches is True:
+            quantile_sketches = 100
+        if quantile_sketches:
+            self.quantiles = QuantileSketches(network.number_of_nodes,
+                network.number_of_classes, quantile_sketches)
+        else:
+            self.quantiles = NoQuantileSketches()
+        if sampling_backend not in ['random', 'numpy']:
+            raise ValueError("Invalid 'sampling_backend'.")
+        self.sampling_backend = sampling_backend
+        self.block_size = block_size
         self.inter_arrival_times = self.find_times_dict('Arr')
         self.service_times = self.find_times_dict('Ser')
         self.number_of_priority_classes = self.network.number_of_priority_classes
@@ -46,9 +107,12 @@ class Simulation(object):
             for i in range(network.number_of_nodes)]
         self.nodes = ([self.ArrivalNodeType(self)] +
                       self.transitive_nodes +
-                      [ExitNode()])
+                      [ExitNode(self.choose_retention(retention))])
+        for node in self.transitive_nodes:
+            node.find_routing()
         self.statetracker = self.choose_tracker(tracker, deadlock_detector)
         self.times_dictionary = {self.statetracker.hash_state(): 0.0}
+        self.state_dates = {self.statetracker.state_id(): 0.0}
         self.times_to_deadlock = {}
         self.rejection_dict = self.nodes[0].rejection_dict
         self.baulked_dict = self.nodes[0].baulked_dict
@@ -63,16 +127,13 @@ class Simulation(object):
         """
         Safely sample from a user defined distribution
         """
-        sample = func()
-        if not isinstance(sample, float) or sample < 0:
-            raise ValueError("UserDefined func must return positive float.")
-        return sample
+        return UserDefinedSampler(func).sample()
 
     def check_timedependent_dist(self, func, current_time):
-        sample = func(current_time)
-        if not isinstance(sample, float) or sample < 0:
-            raise ValueError("TimeDependent func must return positive float.")
-        return sample
+        """
+        Safely sample from a time dependent distribution
+        """
+        return TimeDependentSampler(func).sample(current_time)
 
 
     def choose_tracker(self, tracker, deadlock_detector):
@@ -91,6 +152,17 @@ class Simulation(object):
             return NaiveTracker(self)
         return StateTracker(self)
 
+    @property
+    def deadlock_analysis(self):
+        """
+        The analysis of whether the network can deadlock, found
+        when first needed.
+        """
+        if self._deadlock_analysis is None:
+            self._deadlock_analysis = analyse_deadlock(self.network,
+                custom_nodes=self.custom_nodes)
+        return self._deadlock_analysis
+
     def choose_deadlock_detection(self, deadlock_detector):
         """
         Chooses the deadlock detection mechanism to use for the
@@ -99,58 +171,80 @@ class Simulation(object):
         if deadlock_detector == False:
             return NoDeadlockDetection()
         if deadlock_detector == 'StateDigraph':
-            return StateDigraphMethod()
+            return StateDigraphMethod(active=(
+                self.deadlock_analysis.verdict != 'deadlock-free'))
+
+    def choose_warmup_detection(self, warmup_detector):
+        """
+        Chooses the warm-up detection mechanism to use for the
+        simulation.
+        """
+        if warmup_detector == False:
+            return NoWarmupDetection()
+        if warmup_detector == 'MSER5':
+            return MSERDetection(self, 5)
+        raise ValueError("Invalid 'warmup_detector'.")
+
+    def discard_warmup(self, date):
+        """
+        Restarts the online statistics, quantile sketches and time
+        averages at the given date, discarding the warm-up period.
+        """
+        self.statistics.reset()
+        self.quantiles.reset()
+        self.time_averages.reset(date)
+
+    def choose_retention(self, retention):
+        """
+        Chooses the policy deciding which finished individuals are
+        kept. By default all are kept, unless the record sink does
+        not keep the records in memory.
+        """
+        if retention is None:
+            if self.record_sink.retains_records:
+                retention = RetainAll()
+            else:
+                retention = RetainNone()
+        retention.initialise(self)
+        return retention
 
     def find_distributions(self, n, c, kind):
         """
-        Finds distribution functions
-        """
-        if self.source(c, n, kind) == 'NoArrivals':
-            return lambda : float('Inf')
-        if self.source(c, n, kind)[0] == 'Uniform':
-            return lambda : uniform(self.source(c, n, kind)[1],
-                                    self.source(c, n, kind)[2])
-        if self.source(c, n, kind)[0] == 'Deterministic':
-            return lambda : self.source(c, n, kind)[1]
-        if self.source(c, n, kind)[0] == 'Triangular':
-            return lambda : triangular(self.source(c, n, kind)[1],
-                                       self.source(c, n, kind)[2],
-                                       self.source(c, n, kind)[3])
-        if self.source(c, n, kind)[0] == 'Exponential':
-            return lambda : expovariate(self.source(c, n, kind)[1])
-        if self.source(c, n, kind)[0] == 'Gamma':
-            return lambda : gammavariate(self.source(c, n, kind)[1],
-                                         self.source(c, n, kind)[2])
-        if self.source(c, n, kind)[0] == 'Lognormal':
-            return lambda : lognormvariate(self.source(c, n, kind)[1],
-                                           self.source(c, n, kind)[2])
-        if self.source(c, n, kind)[0] == 'Weibull':
-            return lambda : weibullvariate(self.source(c, n, kind)[1],
-                                           self.source(c, n, kind)[2])
-        if self.source(c, n, kind)[0] == 'Custom':
-            P, V = zip(*self.source(c, n, kind)[1])
-            probs, values = list(P), list(V)
-            return lambda : random_choice(values, probs)
-        if self.source(c, n, kind)[0] == 'UserDefined':
-            return lambda : self.check_userdef_dist(self.source(c, n, kind)[1])
-        if self.source(c, n, kind)[0] == 'Empirical':
-            if isinstance(self.source(c, n, kind)[1], str):
-                empirical_dist = self.import_empirical(self.source(c, n, kind)[1])
-                return lambda : random_choice(empirical_dist)
-            return lambda : random_choice(self.source(c, n, kind)[1])
-        if self.source(c, n, kind)[0] == 'TimeDependent':
-            return lambda t : self.check_timedependent_dist(self.source(c, n, kind)[1], t)
+        Finds distribution functions, compiled into sampler
+        objects with their parameters bound
+        """
+        source = self.source(c, n, kind)
+        if source == 'NoArrivals':
+            return NoArrivalsSampler()
+        if source[0] == 'Empirical' and isinstance(source[1], str):
+            source = ['Empirical', self.import_empirical(source[1])]
+        if self.sampling_backend == 'numpy':
+            sampler = find_numpy_sampler(source,
+                (['Arr', 'Ser'].index(kind), n + 1, c), self.block_size)
+            if sampler is not None:
+                return sampler
+        sampler = dist_samplers[source[0]](*source[1:])
+        sampler.rng = self.find_rng(kind, n + 1, c)
+        return sampler
 
     def find_next_active_node(self):
         """
         Returns the next active node:
         """
-        next_active_node_indices = [i for i, x in enumerate([
-            nd.next_event_date for nd in self.nodes]) if x == min([
-            nd.next_event_date for nd in self.nodes])]
-        if len(next_active_node_indices) > 1:
-            return self.nodes[random_choice(next_active_node_indices)]
-        return self.nodes[next_active_node_indices[0]]
+        return self.event_list.next_active_node()
+
+    def find_rng(self, *key):
+        """
+        Returns the random number generator of the stream identified
+        by key, (purpose, node, customer class). With independent
+        streams each stream has its own generator, derived from the
+        master seed; otherwise all streams share the random module.
+        """
+        if not self.independent_streams:
+            return random
+        if key not in self.streams:
+            self.streams[key] = stream_rng(self.master_seed, *key)
+        return self.streams[key]
 
     def find_times_dict(self, kind):
         """
@@ -172,24 +266,17 @@ class Simulation(object):
 
     def get_all_records(self):
         """
-        Gets all records from all individuals
+        Gets all records from all individuals, or from the
+        record sink if it holds them
         """
+        records = self.record_sink.get_records()
+        if records is not None:
+            self.all_records = records
+            return records
         records = []
         for individual in self.get_all_individuals():
             for record in individual.data_records:
-                records.append(Record(individual.id_number,
-                                record.customer_class,
-                                record.node,
-                                record.arrival_date,
-                                record.wait,
-                                record.service_start_date,
-                                record.service_time,
-                                record.service_end_date,
-                                record.blocked,
-                                record.exit_date,
-                                record.destination,
-                                record.queue_size_at_arrival,
-                                record.queue_size_at_departure))
+                records.append(make_record(individual, record))
         self.all_records = records
         return records
 
@@ -205,6 +292,13 @@ class Simulation(object):
         empirical_file.close()
         return empirical_dist
 
+    def mark_changed(self, node):
+        """
+        Records that an event changed the given node, so that
+        its next event date is recalculated after the event.
+        """
+        self.changed_nodes[node] = True
+
     def set_classes(self, node_class, arrival_node_class):
         """
         Sets the type of classes being used in the Simulation model
@@ -224,36 +318,46 @@ class Simulation(object):
         Carries out the event of current next_active_node, and return the next
         next_active_node
         """
+        self.current_time = current_time
         next_active_node.have_event()
-        for node in self.transitive_nodes:
+        for node in self.changed_nodes:
             node.update_next_event_date(current_time)
+        self.changed_nodes.clear()
         return self.find_next_active_node()
 
     def simulate_until_deadlock(self):
         """
         Runs the simulation until deadlock is reached.
         """
+        if self.deadlock_analysis.verdict == 'deadlock-free':
+            raise ValueError('The network cannot deadlock. %s' %
+                self.deadlock_analysis.reason)
         deadlocked = False
         next_active_node = self.find_next_active_node()
         current_time = next_active_node.next_event_date
         while not deadlocked:
             next_active_node = self.event_and_return_nextnode(next_active_node, current_time)
 
-            current_state = self.statetracker.hash_state()
-            if current_state not in self.times_dictionary:
-                self.times_dictionary[current_state] = current_time
-            deadlocked = self.deadlock_detector.detect_deadlock()
+            state_id = self.statetracker.state_id()
+            if state_id not in self.state_dates:
+                self.state_dates[state_id] = current_time
+            deadlocked = self.deadlock_detector.detect_new_deadlock()
             if deadlocked:
                 time_of_deadlock = current_time
             current_time = next_active_node.next_event_date
-        self.times_to_deadlock = {state:
-            time_of_deadlock - self.times_dictionary[state]
-            for state in self.times_dictionary.keys()}
+        states = [(self.statetracker.state_of(state_id), date)
+            for state_id, date in self.state_dates.items()]
+        self.times_dictionary = {state: date for state, date in states}
+        self.times_to_deadlock = {state: time_of_deadlock - date
+            for state, date in states}
+        self.record_sink.flush()
 
     def simulate_until_max_time(self, max_simulation_time, progress_bar=False):
         """
         Runs the simulation until max_simulation_time is reached.
         """
+        if self.ticks_per_unit is not None:
+            max_simulation_time = self.to_ticks(max_simulation_time)
         next_active_node = self.find_next_active_node()
         current_time = next_active_node.next_event_date
 
@@ -274,6 +378,7 @@ class Simulation(object):
             remaining_time = max(max_simulation_time - self.progress_bar.n, 0)
             self.progress_bar.update(remaining_time)
             self.progress_bar.close()
+        self.record_sink.flush()
 
     def simulate_until_max_customers(self, max_customers,
                                      progress_bar=False, method='Finish'):
@@ -318,6 +423,7 @@ class Simulation(object):
             remaining_time = max(max_customers - self.progress_bar.n, 0)
             self.progress_bar.update(remaining_time)
             self.progress_bar.close()
+        self.record_sink.flush()
 
     def source(self, c, n, kind):
         """
@@ -329,6 +435,20 @@ class Simulation(object):
         if kind == 'Ser':
             return self.network.customer_classes[c].service_distributions[n]
 
+    def to_ticks(self, time):
+        """
+        Converts a time in time units to the nearest number of ticks
+        """
+        if time == float('Inf'):
+            return time
+        return int(round(time * self.ticks_per_unit))
+
+    def to_time(self, ticks):
+        """
+        Converts a number of ticks to time units
+        """
+        return ticks / self.ticks_per_unit
+
     def write_records_to_file(self, file_name, headers=True):
         """
         Writes the records for all individuals to a csv file
@@ -338,19 +458,7 @@ class Simulation(object):
         data_file = open('%s' % directory, 'w')
         csv_wrtr = writer(data_file)
         if headers:
-            csv_wrtr.writerow(['I.D. Number',
-                               'Customer Class',
-                               'Node',
-                               'Arrival Date',
-                               'Waiting Time',
-                               'Service Start Date',
-                               'Service Time',
-                               'Service End Date',
-                               'Time Blocked',
-                               'Exit Date',
-                               'Destination',
-                               'Queue Size at Arrival',
-                               'Queue Size at Departure'])
+            csv_wrtr.writerow(record_headers)
         records = self.get_all_records()
         for row in records:
             csv_wrtr.writerow(row)
@@ -1,8 +1,44 @@
 from __future__ import division
+from collections import deque
+
+__all__ = ['zobrist_key', 'StateTracker', 'NaiveTracker', 'FenwickTree',
+           'SequenceHash', 'MatrixTracker']
+
+MASK = (1 << 64) - 1
+
+
+def zobrist_key(index, value):
+    """
+    A pseudorandom 128 bit key for the given value of the given
+    component of a state, found by mixing the two (splitmix64)
+    into two independent 64 bit halves.
+    """
+    key = 0
+    for half in (0, 1):
+        x = (index * 0x9E3779B97F4A7C15 + value * 0xD1B54A32D192ED03 +
+             half * 0x8CB92BA72F3D8DD7) & MASK
+        x ^= x >> 30
+        x = (x * 0xBF58476D1CE4E5B9) & MASK
+        x ^= x >> 27
+        x = (x * 0x94D049BB133111EB) & MASK
+        key = (key << 64) | (x ^ (x >> 31))
+    return key
+
 
 class StateTracker(object):
     """
-    A generic class to record system's state
+    A generic class to record system's state.
+
+    Each distinct state is interned to an integer id, in the order
+    they are first seen, and stored in a compact form. The state is
+    marked dirty whenever it changes, so the id of an unchanged state
+    is found in O(1).
+
+    Trackers keep a 128 bit Zobrist hash of the state as it changes.
+    States are looked up by its lower 64 bits, and its upper 64 bits
+    are stored to check the state found, so that compact forms are
+    only built when a state is first seen, and only compared when
+    the lower halves of the hashes collide.
     """
     def __init__(self, simulation):
         """
@@ -10,6 +46,65 @@ class StateTracker(object):
         """
         self.simulation = simulation
         self.state = None
+        self.zobrist = 0
+        self.initialise_state_ids()
+
+    def initialise_state_ids(self):
+        """
+        Initialises the table of interned states.
+        """
+        self.states = []
+        self.checks = []
+        self.ids_by_hash = {}
+        self.colliding_ids = {}
+        self.zobrist_keys = {}
+        self.current_id = None
+        self.dirty = True
+
+    def key(self, index, value):
+        """
+        The Zobrist key for the given value of the given component
+        of the state, cached by the tracker.
+        """
+        try:
+            return self.zobrist_keys[index, value]
+        except KeyError:
+            key = self.zobrist_keys[index, value] = zobrist_key(index, value)
+            return key
+
+    def state_hash(self):
+        """
+        Returns the 128 bit hash of the current state.
+        """
+        return self.zobrist
+
+    def state_id(self):
+        """
+        Returns the id of the current state.
+        """
+        if self.dirty:
+            state_hash = self.state_hash()
+            state_id = self.ids_by_hash.get(state_hash & MASK)
+            if state_id is None:
+                state_id = self.add_state(state_hash, self.compact_state())
+                self.ids_by_hash[state_hash & MASK] = state_id
+            elif self.checks[state_id] != state_hash >> 64:
+                compact = self.compact_state()
+                state_id = self.colliding_ids.get(compact)
+                if state_id is None:
+                    state_id = self.add_state(state_hash, compact)
+                    self.colliding_ids[compact] = state_id
+            self.current_id = state_id
+            self.dirty = False
+        return self.current_id
+
+    def add_state(self, state_hash, compact):
+        """
+        Stores a new state in its compact form, and returns its id.
+        """
+        self.states.append(compact)
+        self.checks.append(state_hash >> 64)
+        return len(self.states) - 1
 
     def change_state_accept(self, node_id, cust_cls):
         """
@@ -36,6 +131,20 @@ class StateTracker(object):
         """
         return None
 
+    def compact_state(self):
+        """
+        Returns a compact hashable form of the state, equal for two
+        states only if they are the same state.
+        """
+        return None
+
+    def state_of(self, state_id):
+        """
+        Returns the state with the given id, in the form given by
+        hash_state.
+        """
+        return self.states[state_id]
+
 
 class NaiveTracker(StateTracker):
     """
@@ -53,21 +162,51 @@ class NaiveTracker(StateTracker):
         Initialises the naive tracker class
         """
         self.simulation = simulation
+        self.initialise_state_ids()
         self.state = [[0, 0] for i in range(
             self.simulation.network.number_of_nodes)]
 
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        """
+        Sets the state, and finds its Zobrist hash, the XOR of
+        the keys of the value of each component.
+        """
+        self._state = state
+        self.zobrist = 0
+        for i, counts in enumerate(state):
+            for j, count in enumerate(counts):
+                self.zobrist ^= self.key(2 * i + j, count)
+        self.dirty = True
+
+    def change_count(self, node_id, j, delta):
+        """
+        Changes a count of the state by delta, updating the
+        Zobrist hash.
+        """
+        counts = self._state[node_id-1]
+        index = 2 * (node_id - 1) + j
+        self.zobrist ^= (self.key(index, counts[j]) ^
+                         self.key(index, counts[j] + delta))
+        counts[j] += delta
+        self.dirty = True
+
     def change_state_accept(self, node_id, cust_cls):
         """
         Changes the state of the system when a customer is accepted.
         """
-        self.state[node_id-1][0] += 1
+        self.change_count(node_id, 0, 1)
 
     def change_state_block(self, node_id, destination, cust_cls):
         """
         Changes the state of the system when a customer gets blocked.
         """
-        self.state[node_id-1][1] += 1
-        self.state[node_id-1][0] -= 1
+        self.change_count(node_id, 1, 1)
+        self.change_count(node_id, 0, -1)
 
     def change_state_release(self, node_id, destination,
         cust_cls, blocked):
@@ -75,9 +214,9 @@ class NaiveTracker(StateTracker):
         Changes the state of the system when a customer is released.
         """
         if blocked:
-            self.state[node_id-1][1] -= 1
+            self.change_count(node_id, 1, -1)
         else:
-            self.state[node_id-1][0] -= 1
+            self.change_count(node_id, 0, -1)
 
     def hash_state(self):
         """
@@ -85,6 +224,157 @@ class NaiveTracker(StateTracker):
         """
         return tuple(tuple(obs) for obs in self.state)
 
+    def compact_state(self):
+        """
+        Returns the counts of the state as a flat tuple.
+        """
+        return tuple(count for counts in self._state for count in counts)
+
+    def state_of(self, state_id):
+        """
+        Returns the state with the given id, in the form given by
+        hash_state.
+        """
+        counts = self.states[state_id]
+        return tuple(zip(counts[::2], counts[1::2]))
+
+
+class FenwickTree(object):
+    """
+    A Fenwick (binary indexed) tree over positions 1, 2, ..., that
+    can be appended to, and gives prefix sums and updates in
+    O(log n).
+    """
+    def __init__(self):
+        """
+        Initialises the empty tree
+        """
+        self.tree = [0]
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def append(self, value):
+        """
+        Adds a new last position with the given value, and
+        returns the position.
+        """
+        tree = self.tree
+        i = len(tree)
+        total = value
+        j = i - 1
+        stop = i - (i & -i)
+        while j > stop:
+            total += tree[j]
+            j -= j & -j
+        tree.append(total)
+        return i
+
+    def add(self, i, delta):
+        """
+        Adds delta to the value at position i.
+        """
+        tree = self.tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, i):
+        """
+        The sum of the values at positions 1 to i.
+        """
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+
+class SequenceHash(object):
+    """
+    A segment tree over positions 1, 2, ..., that can be appended
+    to, each position holding a value until it is cleared. It gives
+    a polynomial hash, modulo the prime 2^127 - 1, of the values
+    still held in the order of their positions, updated in O(log n)
+    when a value is appended or cleared.
+    """
+    MODULUS = (1 << 127) - 1
+    BASE = 0x2545F4914F6CDD1D9E3779B97F4A7C15
+
+    def __init__(self):
+        """
+        Initialises the empty tree
+        """
+        self.size = 1
+        self.length = 0
+        self.counts = [0, 0]
+        self.hashes = [0, 0]
+        self.powers = [1, self.BASE]
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def value(self):
+        """
+        The hash of the values held.
+        """
+        return self.hashes[1]
+
+    def append(self, value):
+        """
+        Holds the value at a new last position, and returns the
+        position.
+        """
+        if self.length == self.size:
+            self.grow()
+        self.length += 1
+        self.set(self.length, 1, value % self.MODULUS)
+        return self.length
+
+    def clear(self, i):
+        """
+        Clears the value held at position i.
+        """
+        self.set(i, 0, 0)
+
+    def set(self, i, count, value):
+        """
+        Sets the leaf of position i, and the hashes above it.
+        """
+        counts, hashes, powers = self.counts, self.hashes, self.powers
+        modulus = self.MODULUS
+        i += self.size - 1
+        counts[i] = count
+        hashes[i] = value
+        i >>= 1
+        while i:
+            left = 2 * i
+            counts[i] = counts[left] + counts[left + 1]
+            hashes[i] = (hashes[left] +
+                powers[counts[left]] * hashes[left + 1]) % modulus
+            i >>= 1
+
+    def grow(self):
+        """
+        Doubles the number of positions, rebuilding the tree.
+        """
+        old_size = self.size
+        self.size = size = 2 * old_size
+        counts, hashes = [0] * (2 * size), [0] * (2 * size)
+        counts[size:size + old_size] = self.counts[old_size:]
+        hashes[size:size + old_size] = self.hashes[old_size:]
+        powers, modulus = self.powers, self.MODULUS
+        while len(powers) <= size:
+            powers.append(powers[-1] * self.BASE % modulus)
+        for i in range(size - 1, 0, -1):
+            left = 2 * i
+            counts[i] = counts[left] + counts[left + 1]
+            hashes[i] = (hashes[left] +
+                powers[counts[left]] * hashes[left + 1]) % modulus
+        self.counts, self.hashes = counts, hashes
+
 
 class MatrixTracker(StateTracker):
     """
@@ -101,30 +391,77 @@ class MatrixTracker(StateTracker):
         first, one from the first node to the second, and on from
         the second node to the first. The numbers denote the order
         at which they became blocked.
+
+    Each blockage is stored by a stamp in the order it began, and a
+    Fenwick tree over the stamps marks those still blocked, so that
+    the order of a blockage is the number of blockages still
+    blocked up to its stamp.
+
+    The Zobrist hash of the populations is combined with a
+    polynomial hash of the cells of the blockages still blocked, in
+    the order they began, kept in a segment tree over the same
+    stamps, so that no key depends on the order of a blockage.
     """
     def __init__(self, simulation):
         """
-        Initialises the naive tracker class
+        Initialises the matrix tracker class
         """
         self.simulation = simulation
-        self.state = [[[[] for i in range(
-            self.simulation.network.number_of_nodes)] for i in range(
-            self.simulation.network.number_of_nodes)], [0 for i in range(
-            self.simulation.network.number_of_nodes)]]
-        self.increment = 1
+        self.initialise_state_ids()
+        self.number_of_nodes = self.simulation.network.number_of_nodes
+        self.state = [[[[] for i in range(self.number_of_nodes)]
+            for i in range(self.number_of_nodes)],
+            [0 for i in range(self.number_of_nodes)]]
+
+    @property
+    def state(self):
+        """
+        A copy of the state, with the order of each blockage.
+        """
+        rank = self.order.prefix_sum
+        return [[[[rank(stamp) for stamp in col] for col in row]
+            for row in self.blockages], list(self.populations)]
+
+    @state.setter
+    def state(self, state):
+        """
+        Sets the state, given the order of each blockage.
+        """
+        n = self.number_of_nodes
+        self.blockages = [[deque(col) for col in row] for row in state[0]]
+        self.populations = list(state[-1])
+        self.number_blocked = sum(len(col) for row in state[0] for col in row)
+        cells = [None] * self.number_blocked
+        for i, row in enumerate(state[0]):
+            for j, col in enumerate(row):
+                for rank in col:
+                    cells[rank - 1] = i * n + j
+        self.order = FenwickTree()
+        self.blockage_hash = SequenceHash()
+        for cell in cells:
+            self.order.append(1)
+            self.blockage_hash.append(self.key(n + cell, 0))
+        self.zobrist = 0
+        for i, population in enumerate(self.populations):
+            self.zobrist ^= self.key(i, population)
+        self.dirty = True
 
     def change_state_accept(self, node_id, cust_cls):
         """
         Changes the state of the system when a customer is accepted.
         """
-        self.state[-1][node_id-1] += 1
+        self.change_population(node_id, 1)
 
     def change_state_block(self, node_id, destination, cust_cls):
         """
         Changes the state of the system when a customer gets blocked.
         """
-        self.state[0][node_id-1][destination-1].append(self.increment)
-        self.increment += 1
+        n = self.number_of_nodes
+        self.blockages[node_id-1][destination-1].append(self.order.append(1))
+        self.blockage_hash.append(
+            self.key(n + (node_id - 1) * n + destination - 1, 0))
+        self.number_blocked += 1
+        self.dirty = True
 
     def change_state_release(self, node_id, destination,
         cust_cls, blocked):
@@ -132,37 +469,89 @@ class MatrixTracker(StateTracker):
         Changes the state of the system when a customer is released.
         """
         if blocked:
-            self.state[-1][node_id-1] -= 1
-            self.increment -= 1
-            position = self.find_blocked_position_and_pop(
+            self.change_population(node_id, -1)
+            stamp = self.find_blocked_position_and_pop(
                 node_id, destination)
-            self.adjust_positions(position)
+            self.adjust_positions(stamp)
         else:
-            self.state[-1][node_id-1] -= 1
+            self.change_population(node_id, -1)
+
+    def change_population(self, node_id, delta):
+        """
+        Changes the population of a node by delta, updating the
+        Zobrist hash of the populations.
+        """
+        population = self.populations[node_id-1]
+        self.zobrist ^= (self.key(node_id - 1, population) ^
+                         self.key(node_id - 1, population + delta))
+        self.populations[node_id-1] += delta
+        self.dirty = True
 
     def find_blocked_position_and_pop(self, node_id, destination):
         """
-        Finds the position of the next customer to unblock
+        Finds the stamp of the next customer to unblock
+        """
+        return self.blockages[node_id-1][destination-1].popleft()
+
+    def adjust_positions(self, stamp):
+        """
+        Removes the stamp from the order, so that the order of
+        any later blockages reduces by 1. When most stamps are
+        no longer blocked, the stamps are renumbered.
         """
-        position = self.state[0][node_id-1][destination-1].pop(0)
-        return position
+        self.order.add(stamp, -1)
+        self.blockage_hash.clear(stamp)
+        self.number_blocked -= 1
+        if len(self.order) > 2 * self.number_blocked + 64:
+            self.renumber()
 
-    def adjust_positions(self, position):
+    def renumber(self):
         """
-        Loops through whole matrix, reducing any
-        positions > position by 1
+        Renumbers the stamps of the blockages still blocked
+        by their order.
         """
-        for r in range(len(self.state[0])):
-            for c in range(len(self.state[0][r])):
-                for o in range(len(self.state[0][r][c])):
-                    if self.state[0][r][c][o] > position:
-                        self.state[0][r][c][o] -= 1
+        self.state = self.state
 
     def hash_state(self):
         """
         Returns a hashable state
         """
-        naive = tuple(self.state[-1])
-        matrix = tuple(tuple(tuple(obs for obs in col)
-            for col in row) for row in self.state[0])
-        return (matrix, naive)
+        return self.expand_state(self.compact_state())
+
+    def state_hash(self):
+        """
+        Returns the 128 bit hash of the current state.
+        """
+        return self.zobrist ^ self.blockage_hash.value
+
+    def compact_state(self):
+        """
+        Returns the cells of the blockages in the order they
+        began, and the populations, which together determine the
+        state.
+        """
+        n = self.number_of_nodes
+        cells = sorted((stamp, i * n + j)
+            for i, row in enumerate(self.blockages)
+            for j, col in enumerate(row) for stamp in col)
+        return (tuple(cell for stamp, cell in cells),
+            tuple(self.populations))
+
+    def state_of(self, state_id):
+        """
+        Returns the state with the given id, in the form given by
+        hash_state.
+        """
+        return self.expand_state(self.states[state_id])
+
+    def expand_state(self, compact):
+        """
+        Returns the hashable state with the given compact form.
+        """
+        n = self.number_of_nodes
+        cells, populations = compact
+        matrix = [[[] for j in range(n)] for i in range(n)]
+        for rank, cell in enumerate(cells, 1):
+            matrix[cell // n][cell % n].append(rank)
+        return (tuple(tuple(tuple(col) for col in row) for row in matrix),
+            populations)
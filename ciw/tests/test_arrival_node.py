@@ -199,3 +199,42 @@ class TestArrivalNode(unittest.TestCase):
         AN.update_next_event_date()
         self.assertEqual(AN.next_event_date, 3.33)
 
+
+    def test_arrival_streams(self):
+        params = {'Arrival_distributions': {
+                      'Class 0': [['Deterministic', 2.0],
+                                  'NoArrivals',
+                                  ['Deterministic', 2.0]],
+                      'Class 1': [['Deterministic', 2.0],
+                                  ['Deterministic', 3.0],
+                                  'NoArrivals']},
+                  'Service_distributions': {
+                      'Class 0': [['Deterministic', 1.0]] * 3,
+                      'Class 1': [['Deterministic', 1.0]] * 3},
+                  'Transition_matrices': {
+                      'Class 0': [[0.0] * 3] * 3,
+                      'Class 1': [[0.0] * 3] * 3},
+                  'Number_of_servers': [1, 1, 1]}
+        Q = ciw.Simulation(ciw.create_network(params))
+        AN = Q.nodes[0]
+        self.assertEqual(sorted(AN.stream_entries),
+            [(1, 0), (1, 1), (2, 1), (3, 0)])
+        self.assertEqual(len(AN.arrival_streams), 4)
+        self.assertEqual(AN.event_dates_dict[2][0], float('Inf'))
+        order = []
+        for _ in range(5):
+            order.append((AN.next_event_date, AN.next_node, AN.next_class))
+            AN.have_event()
+        self.assertEqual(order, [(2.0, 1, 0), (2.0, 1, 1), (2.0, 3, 0),
+                                 (3.0, 2, 1), (4.0, 1, 0)])
+        self.assertEqual(len(AN.stream_entries), 4)
+
+        Q = ciw.Simulation(ciw.create_network({
+            'Arrival_distributions': ['NoArrivals'],
+            'Service_distributions': [['Deterministic', 1.0]],
+            'Transition_matrices': [[0.0]],
+            'Number_of_servers': [1]}))
+        AN = Q.nodes[0]
+        self.assertEqual(AN.arrival_streams, [])
+        self.assertEqual(AN.next_event_date, float('Inf'))
+        self.assertEqual((AN.next_node, AN.next_class), (1, 0))
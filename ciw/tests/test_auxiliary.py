@@ -37,6 +37,17 @@ class TestAuxiliary(unittest.TestCase):
         self.assertEqual(b1, b2)
         self.assertEqual(c1, c2)
 
+    def test_seed_entropy(self):
+        ciw.seed(5)
+        self.assertEqual(ciw.seed_entropy(), 5)
+        ciw.seed('Ciw')
+        e = ciw.seed_entropy()
+        self.assertTrue(e >= 0)
+        ciw.seed(-3)
+        self.assertNotEqual(ciw.seed_entropy(), e)
+        ciw.seed('Ciw')
+        self.assertEqual(ciw.seed_entropy(), e)
+
     def test_randomchoice(self):
         ciw.seed(1)
         array = [1, 2, 3, 4, 5, 6, 7, 8]
@@ -78,3 +89,34 @@ class TestAuxiliary(unittest.TestCase):
         self.assertEqual(r1, r2)
 
 
+
+    def test_weighted_choice(self):
+        for array, probs in [
+            ([1, 2, 3, 4, 5, 6, 7, 8],
+             [0.4, 0.2, 0.1, 0.1, 0.05, 0.05, 0.05, 0.05]),
+            (['A', 'B', 'C', 'Ch', 'D', 'Dd', 'E', 'F', 'Ff', 'G', 'Ng', 'H'],
+             [0.0, 0.1, 0.0, 0.3, 0.0, 0.2, 0.0, 0.1, 0.1, 0.0, 0.2, 0.0]),
+            ('Geraint', [0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0]),
+            ([7], [1.0])]:
+            ciw.seed(1)
+            expected = [ciw.random_choice(array, probs) for _ in range(200)]
+            ciw.seed(1)
+            W = ciw.WeightedChoice(array, probs)
+            self.assertEqual([W.choose() for _ in range(200)], expected)
+
+        # Test that no random numbers used in this case:
+        ciw.seed(5)
+        r1 = random.random()
+        ciw.seed(5)
+        W = ciw.WeightedChoice(['Node 1', 'Node 2', 'Exit Node'],
+            [0.0, 0.0, 1.0])
+        choices = [W.choose() for _ in range(100)]
+        r2 = random.random()
+        self.assertEqual(Counter(choices), {'Exit Node': 100})
+        self.assertEqual(r1, r2)
+
+        # Rounding errors in the probabilities never choose past the end:
+        W = ciw.WeightedChoice(['a', 'b'], [0.3, 0.6])
+        ciw.seed(2)
+        self.assertEqual(set([W.choose() for _ in range(100)]),
+                         set(['a', 'b']))
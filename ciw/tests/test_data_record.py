@@ -36,6 +36,14 @@ class TestDataRecord(unittest.TestCase):
         self.assertEqual(r.queue_size_at_departure, 21)
         self.assertEqual(str(r), 'Data Record')
 
+    def test_derived_fields_are_lazy(self):
+        r = ciw.DataRecord(2, 5, 2, 8, 1, 1, 2, 0, 3)
+        self.assertFalse(hasattr(r, '__dict__'))
+        r.service_end_date = 6
+        self.assertEqual(r.service_time, 4)
+        self.assertEqual(r.blocked, 2)
+        self.assertRaises(AttributeError, setattr, r, 'wait', 1)
+
     @given(arrival_date = floats(min_value = 0.0, max_value = 99999.99),
            service_time = floats(min_value = 0.0, max_value = 99999.99),
            inter_service_start_date = floats(min_value = 0.0, max_value = 99999.99),
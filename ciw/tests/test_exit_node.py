@@ -47,3 +47,65 @@ class TestExitNode(unittest.TestCase):
         self.assertEqual(n.next_event_date, float('Inf'))
         self.assertEqual(n.node_capacity, float('Inf'))
 
+
+    def test_retention_policies(self):
+        individuals = [ciw.Individual(i, i % 2) for i in range(1, 101)]
+
+        n = ciw.ExitNode(ciw.RetainNone())
+        for ind in individuals:
+            n.accept(ind, 1.0)
+        self.assertEqual(n.all_individuals, [])
+        self.assertEqual(n.number_of_individuals, 100)
+
+        n = ciw.ExitNode(ciw.RetainTagged(lambda ind: ind.customer_class == 1))
+        for ind in individuals:
+            n.accept(ind, 1.0)
+        self.assertEqual(n.all_individuals, individuals[::2])
+        self.assertEqual(n.number_of_individuals, 100)
+
+        n = ciw.ExitNode(ciw.ReservoirSample(10, seed=3))
+        for ind in individuals:
+            n.accept(ind, 1.0)
+        self.assertEqual(len(n.all_individuals), 10)
+        self.assertEqual(len(set(n.all_individuals)), 10)
+        self.assertTrue(all(ind in individuals for ind in n.all_individuals))
+        self.assertEqual(n.number_of_individuals, 100)
+        self.assertRaises(ValueError, ciw.ReservoirSample, 0)
+
+    def test_retention_in_simulation(self):
+        N = ciw.create_network(
+            'ciw/tests/testing_parameters/params_change_class.yml')
+        ciw.seed(4)
+        Q = ciw.Simulation(N, online_statistics=True)
+        Q.simulate_until_max_time(50)
+        completed = Q.nodes[-1].number_completed
+        count = Q.statistics[1][0].waiting_time.count
+        all_recs = Q.get_all_records()
+
+        ciw.seed(4)
+        Q = ciw.Simulation(N, online_statistics=True,
+                           retention=ciw.RetainNone())
+        Q.simulate_until_max_time(50)
+        self.assertEqual(Q.nodes[-1].all_individuals, [])
+        self.assertEqual(Q.nodes[-1].number_completed, completed)
+        self.assertEqual(Q.statistics[1][0].waiting_time.count, count)
+
+        samples = []
+        for _ in range(2):
+            ciw.seed(4)
+            Q = ciw.Simulation(N, retention=ciw.ReservoirSample(5))
+            Q.simulate_until_max_time(50)
+            samples.append(Q.nodes[-1].all_individuals)
+            self.assertEqual(len(samples[-1]), 5)
+            self.assertEqual(Q.nodes[-1].number_completed, completed)
+            self.assertTrue(all(r in all_recs for r in Q.get_all_records()))
+        self.assertEqual([ind.id_number for ind in samples[0]],
+                         [ind.id_number for ind in samples[1]])
+
+        ciw.seed(4)
+        Q = ciw.Simulation(N, retention=ciw.RetainTagged(
+            lambda ind: ind.id_number % 2 == 0))
+        Q.simulate_until_max_time(50)
+        self.assertTrue(len(Q.nodes[-1].all_individuals) > 0)
+        self.assertTrue(all(ind.id_number % 2 == 0
+                            for ind in Q.nodes[-1].all_individuals))
@@ -0,0 +1,83 @@
+import unittest
+import ciw
+
+
+class TestFutureEventList(unittest.TestCase):
+
+    def test_init_method(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        self.assertEqual(Q.event_list.tie_break, 'Random')
+        self.assertEqual(len(Q.event_list), 1)
+
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'), tie_break='Ordered')
+        self.assertEqual(Q.event_list.tie_break, 'Ordered')
+
+        self.assertRaises(ValueError, ciw.Simulation, ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'), tie_break='Jibberish')
+
+    def test_schedule_method(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        FEL = Q.event_list
+        Q.nodes[2].next_event_date = 4.5
+        Q.nodes[3].next_event_date = 2.5
+        self.assertEqual(len(FEL), 3)
+        self.assertEqual(str(Q.find_next_active_node()), 'Arrival Node')
+        Q.nodes[0].next_event_date = 8.0
+        self.assertEqual(str(Q.find_next_active_node()), 'Node 3')
+        Q.nodes[3].next_event_date = float('Inf')
+        self.assertEqual(len(FEL), 2)
+        self.assertEqual(str(Q.find_next_active_node()), 'Node 2')
+        Q.nodes[2].next_event_date = 9.0
+        self.assertEqual(str(Q.find_next_active_node()), 'Arrival Node')
+        Q.nodes[0].next_event_date = float('Inf')
+        Q.nodes[2].next_event_date = float('Inf')
+        self.assertEqual(len(FEL), 0)
+        self.assertEqual(str(Q.find_next_active_node()), 'Exit Node')
+
+    def test_compact_method(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        FEL = Q.event_list
+        for i in range(200):
+            Q.nodes[1].next_event_date = 500.0 - i
+        self.assertLessEqual(len(FEL.heap), 2 * len(FEL) + 32)
+        self.assertEqual(str(Q.find_next_active_node()), 'Arrival Node')
+        Q.nodes[0].next_event_date = 400.0
+        self.assertEqual(str(Q.find_next_active_node()), 'Node 1')
+        self.assertEqual(Q.find_next_active_node().next_event_date, 301.0)
+
+    def test_tie_break_policies(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'), tie_break='Ordered')
+        for node in Q.nodes[:-1]:
+            node.next_event_date = 3.0
+        chosen = set([str(Q.find_next_active_node()) for _ in range(50)])
+        self.assertEqual(chosen, set(['Arrival Node']))
+
+        ciw.seed(5)
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        Q.nodes[0].next_event_date = 7.0
+        for node in Q.nodes[2:-1]:
+            node.next_event_date = 3.0
+        chosen = set([str(Q.find_next_active_node()) for _ in range(50)])
+        self.assertEqual(chosen, set(['Node 2', 'Node 3', 'Node 4']))
+
+    def test_ordered_simultaneous_events_example(self):
+        params = {'Arrival_distributions': [['Deterministic', 10.0],
+                                            'NoArrivals'],
+                  'Service_distributions': [['Deterministic', 5.0],
+                                            ['Deterministic', 5.0]],
+                  'Transition_matrices': [[1.0, 0.0], [0.0, 0.0]],
+                  'Number_of_servers': [2, 1]}
+        completed_inds = []
+        for s in range(20):
+            ciw.seed(s)
+            Q = ciw.Simulation(ciw.create_network(params),
+                tie_break='Ordered')
+            Q.simulate_until_max_time(36)
+            completed_inds.append(len(Q.get_all_individuals()))
+        self.assertEqual(set(completed_inds), set([3]))
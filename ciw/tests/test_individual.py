@@ -1,5 +1,6 @@
 import unittest
 import ciw
+from math import isnan
 from hypothesis import given
 from hypothesis.strategies import integers
 
@@ -12,13 +13,13 @@ class TestIndividual(unittest.TestCase):
         self.assertEqual(i.previous_class, 3)
         self.assertEqual(i.priority_class, 0)
         self.assertEqual(i.id_number, 22)
-        self.assertEqual(i.service_start_date, False)
-        self.assertEqual(i.service_time, False)
-        self.assertEqual(i.service_end_date, False)
-        self.assertEqual(i.arrival_date, False)
-        self.assertEqual(i.destination, False)
-        self.assertEqual(i.queue_size_at_arrival, False)
-        self.assertEqual(i.queue_size_at_departure, False)
+        self.assertTrue(isnan(i.service_start_date))
+        self.assertTrue(isnan(i.service_time))
+        self.assertTrue(isnan(i.service_end_date))
+        self.assertTrue(isnan(i.arrival_date))
+        self.assertIsNone(i.destination)
+        self.assertEqual(i.queue_size_at_arrival, -1)
+        self.assertEqual(i.queue_size_at_departure, -1)
         self.assertEqual(i.data_records, [])
 
     def test_init_method_2(self):
@@ -27,13 +28,13 @@ class TestIndividual(unittest.TestCase):
         self.assertEqual(i.previous_class, 0)
         self.assertEqual(i.priority_class, 0)
         self.assertEqual(i.id_number, 5)
-        self.assertEqual(i.service_start_date, False)
-        self.assertEqual(i.service_time, False)
-        self.assertEqual(i.service_end_date, False)
-        self.assertEqual(i.arrival_date, False)
-        self.assertEqual(i.destination, False)
-        self.assertEqual(i.queue_size_at_arrival, False)
-        self.assertEqual(i.queue_size_at_departure, False)
+        self.assertTrue(isnan(i.service_start_date))
+        self.assertTrue(isnan(i.service_time))
+        self.assertTrue(isnan(i.service_end_date))
+        self.assertTrue(isnan(i.arrival_date))
+        self.assertIsNone(i.destination)
+        self.assertEqual(i.queue_size_at_arrival, -1)
+        self.assertEqual(i.queue_size_at_departure, -1)
         self.assertEqual(i.data_records, [])
 
     def test_init_method_3(self):
@@ -42,19 +43,26 @@ class TestIndividual(unittest.TestCase):
         self.assertEqual(i.previous_class, 0)
         self.assertEqual(i.priority_class, 2)
         self.assertEqual(i.id_number, 5)
-        self.assertEqual(i.service_start_date, False)
-        self.assertEqual(i.service_time, False)
-        self.assertEqual(i.service_end_date, False)
-        self.assertEqual(i.arrival_date, False)
-        self.assertEqual(i.destination, False)
-        self.assertEqual(i.queue_size_at_arrival, False)
-        self.assertEqual(i.queue_size_at_departure, False)
+        self.assertTrue(isnan(i.service_start_date))
+        self.assertTrue(isnan(i.service_time))
+        self.assertTrue(isnan(i.service_end_date))
+        self.assertTrue(isnan(i.arrival_date))
+        self.assertIsNone(i.destination)
+        self.assertEqual(i.queue_size_at_arrival, -1)
+        self.assertEqual(i.queue_size_at_departure, -1)
         self.assertEqual(i.data_records, [])
 
     def test_repr_method(self):
         i = ciw.Individual(3, 6)
         self.assertEqual(str(i), 'Individual 3')
 
+    def test_slots(self):
+        i = ciw.Individual(3, 6)
+        self.assertFalse(hasattr(i, '__dict__'))
+        self.assertRaises(AttributeError, setattr, i, 'unknown', 1)
+        s = ciw.Server(None, 1)
+        self.assertFalse(hasattr(s, '__dict__'))
+
     @given(id_num = integers(),
            customer_class = integers(),
            priority_class=integers())
@@ -64,13 +72,13 @@ class TestIndividual(unittest.TestCase):
         self.assertEqual(i.previous_class, customer_class)
         self.assertEqual(i.priority_class, priority_class)
         self.assertEqual(i.id_number, id_num)
-        self.assertEqual(i.service_start_date, False)
-        self.assertEqual(i.service_time, False)
-        self.assertEqual(i.service_end_date, False)
-        self.assertEqual(i.arrival_date, False)
-        self.assertEqual(i.destination, False)
-        self.assertEqual(i.queue_size_at_arrival, False)
-        self.assertEqual(i.queue_size_at_departure, False)
+        self.assertTrue(isnan(i.service_start_date))
+        self.assertTrue(isnan(i.service_time))
+        self.assertTrue(isnan(i.service_end_date))
+        self.assertTrue(isnan(i.arrival_date))
+        self.assertIsNone(i.destination)
+        self.assertEqual(i.queue_size_at_arrival, -1)
+        self.assertEqual(i.queue_size_at_departure, -1)
         self.assertEqual(i.data_records, [])
 
     @given(id_num = integers())
@@ -80,13 +88,13 @@ class TestIndividual(unittest.TestCase):
         self.assertEqual(i.previous_class, 0)
         self.assertEqual(i.priority_class, 0)
         self.assertEqual(i.id_number, id_num)
-        self.assertEqual(i.service_start_date, False)
-        self.assertEqual(i.service_time, False)
-        self.assertEqual(i.service_end_date, False)
-        self.assertEqual(i.arrival_date, False)
-        self.assertEqual(i.destination, False)
-        self.assertEqual(i.queue_size_at_arrival, False)
-        self.assertEqual(i.queue_size_at_departure, False)
+        self.assertTrue(isnan(i.service_start_date))
+        self.assertTrue(isnan(i.service_time))
+        self.assertTrue(isnan(i.service_end_date))
+        self.assertTrue(isnan(i.arrival_date))
+        self.assertIsNone(i.destination)
+        self.assertEqual(i.queue_size_at_arrival, -1)
+        self.assertEqual(i.queue_size_at_departure, -1)
         self.assertEqual(i.data_records, [])
 
     @given(id_num = integers(),
@@ -1,5 +1,6 @@
 import unittest
 import ciw
+from math import isnan
 
 class TestNode(unittest.TestCase):
 
@@ -194,7 +195,7 @@ class TestNode(unittest.TestCase):
         N.all_individuals[1].exit_date = 0.04
         N.update_next_event_date(N.next_event_date + 0.00001)
         self.assertEqual(round(N.next_event_date, 5), 0.03708)
-        N.release(1, Q.transitive_nodes[1], N.next_event_date)
+        N.release(N.all_individuals[1], Q.transitive_nodes[1], N.next_event_date)
         self.assertEqual([str(obs) for obs in N.all_individuals],
             ['Individual 1', 'Individual 3'])
         self.assertEqual([[str(obs) for obs in pr_cls] for pr_cls in N.individuals],
@@ -225,8 +226,8 @@ class TestNode(unittest.TestCase):
                  'Server 4 at Node 2']))
         self.assertEqual(ind.arrival_date, 100.0)
         self.assertEqual(ind.service_time, 3.14)
-        self.assertEqual(ind.service_start_date, False)
-        self.assertEqual(ind.service_end_date, False)
+        self.assertTrue(isnan(ind.service_start_date))
+        self.assertTrue(isnan(ind.service_end_date))
         Q.transitive_nodes[0].begin_service_if_possible_release(200.0)
         self.assertEqual(ind.arrival_date, 100.0)
         self.assertEqual(round(ind.service_time ,5), 3.14)
@@ -234,17 +235,16 @@ class TestNode(unittest.TestCase):
         self.assertEqual(round(ind.service_end_date, 5), 203.14)
 
     def test_release_blocked_individual_method(self):
+        ciw.seed(4)
         Q = ciw.Simulation(ciw.create_network(
             'ciw/tests/testing_parameters/params_deadlock.yml'),
             deadlock_detector='StateDigraph')
         N1 = Q.transitive_nodes[0]
         N2 = Q.transitive_nodes[1]
-        N1.individuals = [[ciw.Individual(i) for i in range(N1.c + 3)]]
-        N2.individuals = [[ciw.Individual(i + 100) for i in range(N2.c + 4)]]
-        for ind in N1.all_individuals[:2]:
-            N1.attach_server(N1.find_free_server(), ind)
-        for ind in N2.all_individuals[:1]:
-            N2.attach_server(N2.find_free_server(), ind)
+        for i in range(N1.c + 3):
+            N1.accept(ciw.Individual(i), 1)
+        for i in range(N2.c + 4):
+            N2.accept(ciw.Individual(i + 100), 1)
 
         self.assertEqual([str(obs) for obs in N1.all_individuals],
             ['Individual 0',
@@ -286,9 +286,12 @@ class TestNode(unittest.TestCase):
              'Individual 107',
              'Individual 108'])
 
-        N1.blocked_queue = [(1, 1), (2, 100)]
-        rel_ind = N1.individuals[0].pop(0)
-        N1.detatch_server(rel_ind.server, rel_ind)
+        N1.release(N1.all_individuals[0], Q.nodes[-1], 105)
+        N1.block_individual(N1.all_individuals[0], N1)
+        N2.block_individual(N2.all_individuals[0], N1)
+        self.assertEqual(N1.blocked_queue, [(1, 1), (2, 100)])
+        self.assertEqual(sorted(N1.blocked_individuals), [1])
+        self.assertEqual(sorted(N2.blocked_individuals), [100])
 
         N1.release_blocked_individual(110)
         self.assertEqual([str(obs) for obs in N1.all_individuals],
@@ -309,6 +312,9 @@ class TestNode(unittest.TestCase):
              'Individual 106',
              'Individual 107',
              'Individual 108'])
+        self.assertEqual(N1.blocked_queue, [])
+        self.assertEqual(N1.blocked_individuals, {})
+        self.assertEqual(N2.blocked_individuals, {})
 
     def test_accept_method(self):
         ciw.seed(6)
@@ -367,7 +373,7 @@ class TestNode(unittest.TestCase):
              'Individual 9',
              'Individual 10'])
         self.assertEqual(round(ind10.arrival_date, 5), 0.1)
-        self.assertEqual(ind10.service_start_date, False)
+        self.assertTrue(isnan(ind10.service_start_date))
         self.assertEqual(round(ind10.service_time, 5), 0.16534)
 
     def test_begin_service_if_possible_accept_method(self):
@@ -387,10 +393,10 @@ class TestNode(unittest.TestCase):
                  'Server 3 at Node 1',
                  'Server 4 at Node 1',
                  'Server 4 at Node 2']))
-        self.assertEqual(ind.arrival_date, False)
-        self.assertEqual(ind.service_time, False)
-        self.assertEqual(ind.service_start_date, False)
-        self.assertEqual(ind.service_end_date, False)
+        self.assertTrue(isnan(ind.arrival_date))
+        self.assertTrue(isnan(ind.service_time))
+        self.assertTrue(isnan(ind.service_start_date))
+        self.assertTrue(isnan(ind.service_end_date))
         Q.transitive_nodes[0].begin_service_if_possible_accept(ind, 300)
         self.assertEqual(ind.arrival_date, 300)
         self.assertEqual(round(ind.service_time, 5), 0.03382)
@@ -412,6 +418,7 @@ class TestNode(unittest.TestCase):
         ind1.service_end_date = 0.5
         N.next_event_date = 0.3
         N.individuals = [[ind1]]
+        N.schedule_completion(ind1)
         N.update_next_event_date(N.next_event_date + 0.000001)
         self.assertEqual(N.next_event_date, 0.5)
 
@@ -422,6 +429,7 @@ class TestNode(unittest.TestCase):
         ind2.exit_date = False
 
         N.individuals = [[ind1, ind2]]
+        N.schedule_completion(ind2)
         N.update_next_event_date(N.next_event_date + 0.000001)
         self.assertEqual(N.next_event_date, 0.6)
 
@@ -445,12 +453,111 @@ class TestNode(unittest.TestCase):
         ind1.service_end_date = 0.5
         N.next_event_date = 0.3
         N.individuals = [[ind1]]
+        N.schedule_completion(ind1)
         N.update_next_event_date(N.next_event_date + 0.000001)
         self.assertEqual(N.next_event_date, 0.5)
 
         N.update_next_event_date(N.next_event_date + 0.000001)
         self.assertEqual(N.next_event_date, 30)
 
+    def test_completion_index(self):
+        params = {'Arrival_distributions': [['Exponential', 1.0]],
+                  'Service_distributions': [['Deterministic', 2.0]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': ['Inf']}
+        Q = ciw.Simulation(ciw.create_network(params))
+        N = Q.transitive_nodes[0]
+        inds = [ciw.Individual(i + 1) for i in range(4)]
+        for ind, current_time in zip(inds, [1.0, 0.5, 1.5, 0.5]):
+            N.accept(ind, current_time)
+        self.assertEqual(len(N.completion_entries), 4)
+        N.update_next_event_date(0.5)
+        self.assertEqual(N.next_event_date, 2.5)
+
+        N.cancel_completion(inds[1])
+        N.cancel_completion(inds[3])
+        self.assertEqual(len(N.completion_entries), 2)
+        N.update_next_event_date(0.5)
+        self.assertEqual(N.next_event_date, 3.0)
+        self.assertEqual(str(N.find_next_individual()), 'Individual 1')
+        N.update_next_event_date(3.0)
+        self.assertEqual(N.next_event_date, 3.5)
+
+        inds[1].service_end_date = 3.25
+        N.schedule_completion(inds[1])
+        inds[1].service_end_date = 3.75
+        N.schedule_completion(inds[1])
+        self.assertEqual(len(N.completion_entries), 2)
+        N.update_next_event_date(3.0)
+        self.assertEqual(N.next_event_date, 3.5)
+        self.assertEqual(str(N.find_next_individual()), 'Individual 3')
+        N.update_next_event_date(3.5)
+        self.assertEqual(N.next_event_date, 3.75)
+        self.assertEqual(str(N.find_next_individual()), 'Individual 2')
+        N.update_next_event_date(3.75)
+        self.assertEqual(N.next_event_date, float('Inf'))
+
+    def test_simultaneous_completions(self):
+        params = {'Arrival_distributions': [['Exponential', 1.0]],
+                  'Service_distributions': [['Deterministic', 2.0]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': ['Inf']}
+        Q = ciw.Simulation(ciw.create_network(params), tie_break='Ordered')
+        N = Q.transitive_nodes[0]
+        for i in range(5):
+            N.accept(ciw.Individual(i + 1), 1.0)
+        N.update_next_event_date(1.0)
+        self.assertEqual(N.next_event_date, 3.0)
+        self.assertEqual([str(N.find_next_individual()) for _ in range(5)],
+            ['Individual 1', 'Individual 2', 'Individual 3',
+             'Individual 4', 'Individual 5'])
+
+        ciw.seed(3)
+        Q = ciw.Simulation(ciw.create_network(params))
+        N = Q.transitive_nodes[0]
+        for i in range(5):
+            N.accept(ciw.Individual(i + 1), 1.0)
+        N.update_next_event_date(1.0)
+        finishers = [str(N.find_next_individual()) for _ in range(5)]
+        self.assertEqual(sorted(finishers),
+            ['Individual 1', 'Individual 2', 'Individual 3',
+             'Individual 4', 'Individual 5'])
+        self.assertEqual(N.completion_entries, {})
+
+    def test_simultaneous_completions_with_priorities_and_blocking(self):
+        params = {
+            'Arrival_distributions': {
+                'Class 0': [['Deterministic', 10.0], 'NoArrivals'],
+                'Class 1': [['Deterministic', 11.0], 'NoArrivals']},
+            'Service_distributions': {
+                'Class 0': [['Deterministic', 2.0], ['Deterministic', 10.0]],
+                'Class 1': [['Deterministic', 1.0], ['Deterministic', 10.0]]},
+            'Transition_matrices': {
+                'Class 0': [[0.0, 1.0], [0.0, 0.0]],
+                'Class 1': [[0.0, 1.0], [0.0, 0.0]]},
+            'Priority_classes': {'Class 0': 1, 'Class 1': 0},
+            'Number_of_servers': ['Inf', 1],
+            'Queue_capacities': ['Inf', 0]}
+        N = ciw.create_network(params)
+        Q = ciw.Simulation(N, tie_break='Ordered')
+        Q.simulate_until_max_time(12.5)
+        self.assertEqual(
+            [str(ind) for ind in Q.transitive_nodes[1].all_individuals],
+            ['Individual 1'])
+        self.assertEqual(
+            [(str(ind), ind.is_blocked)
+             for ind in Q.transitive_nodes[0].all_individuals],
+            [('Individual 2', True)])
+        self.assertEqual(Q.transitive_nodes[1].blocked_queue, [(1, 2)])
+        self.assertEqual(Q.transitive_nodes[0].next_event_date, float('Inf'))
+
+        for seed in range(5):
+            ciw.seed(seed)
+            Q = ciw.Simulation(N)
+            Q.simulate_until_max_time(12.5)
+            self.assertEqual(len(Q.transitive_nodes[1].blocked_queue), 1)
+            self.assertEqual(Q.transitive_nodes[0].completion_entries, {})
+
     def test_next_node_method(self):
         ciw.seed(6)
         Q = ciw.Simulation(ciw.create_network(
@@ -533,6 +640,84 @@ class TestNode(unittest.TestCase):
         N1.individuals = [[3, 'help', 1], [], [1, 9]]
         self.assertEqual(N1.all_individuals, [3, 'help', 1, 1, 9])
 
+    def test_population_counters(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params_priorities.yml'))
+        N = Q.transitive_nodes[0]
+        self.assertEqual(N.number_of_individuals, 0)
+        self.assertEqual(N.number_in_priority_class, [0, 0])
+        self.assertEqual(N.number_in_service, 0)
+        inds = [ciw.Individual(i + 1, i % 2, i % 2) for i in range(7)]
+        for ind in inds:
+            N.accept(ind, 1.0)
+        self.assertEqual(N.number_of_individuals, 7)
+        self.assertEqual(N.number_in_priority_class, [4, 3])
+        self.assertEqual(N.number_in_service, 4)
+        self.assertEqual([str(obs) for obs in N.all_individuals
+            if obs.server is None],
+            ['Individual 5', 'Individual 7', 'Individual 6'])
+
+        N.release(inds[1], Q.nodes[-1], 11.0)
+        self.assertEqual(N.number_of_individuals, 6)
+        self.assertEqual(N.number_in_priority_class, [4, 2])
+        self.assertEqual(N.number_in_service, 4)
+        self.assertEqual(inds[4].service_start_date, 11.0)
+        self.assertEqual([str(obs) for obs in N.all_individuals
+            if obs.server is None],
+            ['Individual 7', 'Individual 6'])
+
+        N.release(inds[0], Q.nodes[-1], 11.0)
+        N.release(inds[2], Q.nodes[-1], 11.0)
+        self.assertEqual(N.number_of_individuals, 4)
+        self.assertEqual(N.number_in_priority_class, [2, 2])
+        self.assertEqual(N.number_in_service, 4)
+        self.assertEqual(inds[5].service_start_date, 11.0)
+        self.assertEqual([str(obs) for obs in N.all_individuals
+            if obs.server is None], [])
+
+    def test_free_server_pool(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        N = Q.transitive_nodes[2]
+        self.assertEqual(str(N.find_free_server()), 'Server 1 at Node 3')
+        inds = [ciw.Individual(i + 1) for i in range(8)]
+        for ind in inds[:3]:
+            N.attach_server(N.find_free_server(), ind)
+        self.assertEqual(str(N.find_free_server()), 'Server 4 at Node 3')
+        N.detatch_server(inds[1].server, inds[1])
+        self.assertEqual(str(N.find_free_server()), 'Server 2 at Node 3')
+        N.kill_server(N.servers[1])
+        self.assertEqual(str(N.find_free_server()), 'Server 4 at Node 3')
+        for ind in inds[3:]:
+            N.attach_server(N.find_free_server(), ind)
+        self.assertEqual([str(ind.server) for ind in inds[3:]],
+            ['Server 4 at Node 3', 'Server 5 at Node 3',
+             'Server 6 at Node 3', 'Server 7 at Node 3',
+             'Server 8 at Node 3'])
+        self.assertFalse(N.free_server())
+        self.assertEqual(N.find_free_server(), None)
+        inds[6].server.offduty = True
+        N.detatch_server(inds[6].server, inds[6])
+        self.assertFalse(N.free_server())
+        self.assertEqual(len(N.servers), 6)
+        N.detatch_server(inds[0].server, inds[0])
+        self.assertTrue(N.free_server())
+        self.assertEqual(str(N.find_free_server()), 'Server 1 at Node 3')
+
+    def test_servers_list_is_cached(self):
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        N = Q.transitive_nodes[2]
+        servers = N.servers
+        self.assertIs(N.servers, servers)
+        N.kill_server(servers[1])
+        self.assertEqual(len(servers), 8)
+        self.assertEqual([s.id_number for s in N.servers],
+            [1, 3, 4, 5, 6, 7, 8])
+        N.add_server(9)
+        self.assertEqual(N.servers[-1].id_number, 9)
+        self.assertIs(N.servers, N.servers)
+
     def test_if_putting_individuals_in_correct_priority_queue(self):
         Q = ciw.Simulation(ciw.create_network(
             'ciw/tests/testing_parameters/params_priorities.yml'))
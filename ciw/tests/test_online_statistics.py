@@ -0,0 +1,100 @@
+import unittest
+import ciw
+from decimal import Decimal
+from hypothesis import given
+from hypothesis.strategies import floats, lists
+
+
+class TestOnlineStatistics(unittest.TestCase):
+
+    def test_running_statistics(self):
+        R = ciw.RunningStatistics()
+        self.assertEqual(R.count, 0)
+        self.assertNotEqual(R.variance, R.variance)
+        for value in [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]:
+            R.observe(value)
+        self.assertEqual(R.count, 8)
+        self.assertEqual(R.mean, 5.0)
+        self.assertAlmostEqual(R.variance, 32.0 / 7)
+        self.assertEqual((R.min, R.max), (2.0, 9.0))
+        self.assertEqual(str(R), 'Running Statistics (count 8, mean 5.0)')
+
+    @given(values=lists(floats(min_value=-1000.0, max_value=1000.0),
+                        min_size=2, max_size=50))
+    def test_running_statistics_hypothesis(self, values):
+        R = ciw.RunningStatistics()
+        for value in values:
+            R.observe(value)
+        mean = sum(values) / len(values)
+        variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+        self.assertAlmostEqual(R.mean, mean, places=6)
+        self.assertAlmostEqual(R.variance, variance, places=4)
+        self.assertEqual(R.min, min(values))
+        self.assertEqual(R.max, max(values))
+
+    @given(values=lists(floats(min_value=-1000.0, max_value=1000.0),
+                        min_size=2, max_size=50),
+           split=lists(floats(min_value=0.0, max_value=1.0),
+                       min_size=1, max_size=1))
+    def test_running_statistics_merge(self, values, split):
+        cut = int(split[0] * len(values))
+        R, R1, R2 = (ciw.RunningStatistics() for _ in range(3))
+        for value in values:
+            R.observe(value)
+        for value in values[:cut]:
+            R1.observe(value)
+        for value in values[cut:]:
+            R2.observe(value)
+        R1.merge(R2)
+        self.assertEqual(R1.count, R.count)
+        self.assertAlmostEqual(R1.mean, R.mean, places=6)
+        self.assertAlmostEqual(R1.variance, R.variance, places=4)
+        self.assertEqual((R1.min, R1.max), (R.min, R.max))
+
+    def test_online_statistics_in_simulation(self):
+        N = ciw.create_network(
+            'ciw/tests/testing_parameters/params_change_class.yml')
+        ciw.seed(4)
+        Q = ciw.Simulation(N, online_statistics=True)
+        Q.simulate_until_max_time(50)
+        recs = Q.get_all_records()
+        for node in [1, 2]:
+            for cls in [0, 1]:
+                stats = Q.statistics[node][cls]
+                waits = [r.waiting_time for r in recs
+                         if r.node == node and r.customer_class == cls]
+                sojourns = [r.exit_date - r.arrival_date for r in recs
+                            if r.node == node and r.customer_class == cls]
+                self.assertEqual(stats.waiting_time.count, len(waits))
+                self.assertAlmostEqual(stats.waiting_time.mean,
+                                       sum(waits) / len(waits))
+                self.assertEqual(stats.waiting_time.max, max(waits))
+                self.assertAlmostEqual(stats.sojourn_time.mean,
+                                       sum(sojourns) / len(sojourns))
+                self.assertEqual(stats.service_time.count, len(waits))
+                self.assertEqual(stats.time_blocked.count, len(waits))
+
+        Q = ciw.Simulation(N)
+        self.assertIsInstance(Q.statistics, ciw.NoOnlineStatistics)
+
+    def test_online_statistics_exact(self):
+        N = ciw.create_network(
+            'ciw/tests/testing_parameters/params_change_class.yml')
+        ciw.seed(4)
+        Q = ciw.Simulation(N, online_statistics=True, exact=26)
+        Q.simulate_until_max_time(50)
+        recs = Q.get_all_records()
+        stats = Q.statistics[1][0]
+        waits = [r.waiting_time for r in recs
+                 if r.node == 1 and r.customer_class == 0]
+        self.assertIsInstance(stats.waiting_time.mean, Decimal)
+        self.assertEqual(stats.waiting_time.count, len(waits))
+        self.assertAlmostEqual(stats.waiting_time.mean,
+                               sum(waits) / len(waits))
+        self.assertEqual(stats.waiting_time.max, max(waits))
+
+        R = ciw.RunningStatistics()
+        R.merge(stats.waiting_time)
+        R.merge(stats.waiting_time)
+        self.assertEqual(R.count, 2 * len(waits))
+        self.assertAlmostEqual(R.mean, stats.waiting_time.mean)
@@ -0,0 +1,82 @@
+import unittest
+import ciw
+import random
+from bisect import bisect_left
+
+
+class TestQuantiles(unittest.TestCase):
+
+    def test_tdigest_small(self):
+        D = ciw.TDigest()
+        self.assertNotEqual(D.quantile(0.5), D.quantile(0.5))
+        for value in [5.0, 1.0, 4.0, 2.0, 3.0]:
+            D.observe(value)
+        self.assertEqual(D.count, 5)
+        self.assertEqual(D.quantile(0.0), 1.0)
+        self.assertEqual(D.quantile(0.5), 3.0)
+        self.assertEqual(D.quantile(0.3), 2.0)
+        self.assertEqual(D.quantile(1.0), 5.0)
+        self.assertEqual(str(D), 'TDigest (count 5)')
+        self.assertRaises(ValueError, D.quantile, 1.5)
+        self.assertRaises(ValueError, ciw.TDigest, 0)
+
+    def test_tdigest_bounded_error_and_memory(self):
+        r = random.Random(5)
+        values = [r.expovariate(1.0) for _ in range(50000)]
+        ordered = sorted(values)
+        D = ciw.TDigest(100)
+        for value in values:
+            D.observe(value)
+        self.assertLessEqual(len(D.centroids), 100)
+        self.assertLessEqual(len(D.buffer), D.buffer_size)
+        for q, tolerance in [(0.5, 0.01), (0.95, 0.002), (0.99, 0.001)]:
+            rank = bisect_left(ordered, D.quantile(q)) / len(values)
+            self.assertAlmostEqual(rank, q, delta=tolerance)
+
+    def test_tdigest_merge(self):
+        r = random.Random(6)
+        values = [r.random() for _ in range(20000)]
+        D1, D2, D = ciw.TDigest(), ciw.TDigest(), ciw.TDigest()
+        for value in values[:7000]:
+            D1.observe(value)
+        for value in values[7000:]:
+            D2.observe(value)
+        for value in values:
+            D.observe(value)
+        D1.merge(D2)
+        self.assertEqual(D1.count, 20000)
+        self.assertEqual((D1.min, D1.max), (min(values), max(values)))
+        for q in [0.05, 0.5, 0.95, 0.99]:
+            self.assertAlmostEqual(D1.quantile(q), q, delta=0.01)
+            self.assertAlmostEqual(D1.quantile(q), D.quantile(q), delta=0.01)
+
+    def test_quantile_sketches_in_simulation(self):
+        N = ciw.create_network(
+            'ciw/tests/testing_parameters/params_change_class.yml')
+        ciw.seed(4)
+        Q = ciw.Simulation(N)
+        Q.simulate_until_max_time(50)
+        recs = Q.get_all_records()
+        ciw.seed(4)
+        Q = ciw.Simulation(N, quantile_sketches=True)
+        Q.simulate_until_max_time(50)
+        self.assertEqual(Q.get_all_records(), recs)
+        for node in [1, 2]:
+            for cls in [0, 1]:
+                waits = sorted(r.waiting_time for r in recs
+                               if r.node == node and r.customer_class == cls)
+                sketch = Q.quantiles[node][cls]
+                self.assertEqual(sketch.waiting_time.count, len(waits))
+                self.assertEqual(sketch.sojourn_time.count, len(waits))
+                self.assertEqual(sketch.waiting_time.quantile(1.0), waits[-1])
+
+        ciw.seed(5)
+        Q2 = ciw.Simulation(N, quantile_sketches=50)
+        Q2.simulate_until_max_time(50)
+        count = Q2.quantiles[1][0].waiting_time.count
+        Q2.quantiles.merge(Q.quantiles)
+        self.assertEqual(Q2.quantiles[1][0].waiting_time.count,
+            count + Q.quantiles[1][0].waiting_time.count)
+
+        Q = ciw.Simulation(N)
+        self.assertIsInstance(Q.quantiles, ciw.NoQuantileSketches)
@@ -0,0 +1,121 @@
+import unittest
+import ciw
+import csv
+import gzip
+import os
+
+
+class TestRecordSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.N = ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml')
+        ciw.seed(2)
+        Q = ciw.Simulation(self.N)
+        Q.simulate_until_max_time(50)
+        self.expected = sorted(Q.get_all_records())
+
+    def test_default_sink_keeps_records(self):
+        Q = ciw.Simulation(self.N)
+        self.assertIsInstance(Q.record_sink, ciw.RecordSink)
+        self.assertTrue(Q.record_sink.retains_records)
+        self.assertIsInstance(Q.nodes[-1].retention, ciw.RetainAll)
+        self.assertNotIsInstance(Q.nodes[-1].retention, ciw.RetainNone)
+
+    def test_csv_sink(self):
+        file_name = 'ciw/tests/testing_parameters/sink.csv'
+        ciw.seed(2)
+        Q = ciw.Simulation(self.N, record_sink=ciw.CSVSink(file_name))
+        Q.simulate_until_max_time(50)
+        Q.record_sink.close()
+        self.assertEqual(Q.get_all_records(), [])
+        self.assertEqual(Q.nodes[-1].all_individuals, [])
+        self.assertTrue(Q.nodes[-1].number_completed > 0)
+        with open(file_name, 'r') as data_file:
+            rows = list(csv.reader(data_file))
+        os.remove(file_name)
+        self.assertEqual(rows[0], ciw.record_headers)
+        self.assertEqual(len(rows) - 1, len(self.expected))
+        self.assertEqual(sorted([int(row[0]), float(row[3])]
+            for row in rows[1:]), sorted([r.id_number, r.arrival_date]
+            for r in self.expected))
+
+    def test_gzip_csv_sink(self):
+        file_name = 'ciw/tests/testing_parameters/sink.csv.gz'
+        ciw.seed(2)
+        Q = ciw.Simulation(self.N,
+            record_sink=ciw.GzipCSVSink(file_name, headers=False))
+        Q.simulate_until_max_time(50)
+        Q.record_sink.close()
+        with gzip.open(file_name, 'rt') as data_file:
+            rows = list(csv.reader(data_file))
+        os.remove(file_name)
+        self.assertEqual(len(rows), len(self.expected))
+        self.assertEqual(sorted(float(row[6]) for row in rows),
+                         sorted(r.service_time for r in self.expected))
+
+    def test_binary_sink(self):
+        file_name = 'ciw/tests/testing_parameters/sink.bin'
+        ciw.seed(2)
+        Q = ciw.Simulation(self.N,
+            record_sink=ciw.BinarySink(file_name, chunk_size=7))
+        Q.simulate_until_max_time(50)
+        Q.record_sink.close()
+        records = list(ciw.read_binary_records(file_name))
+        os.remove(file_name)
+        self.assertEqual(sorted(records), self.expected)
+        self.assertRaises(ValueError, ciw.BinarySink, file_name, 0)
+
+        with open(file_name, 'wb') as data_file:
+            data_file.write(b'not ciw')
+        self.assertRaises(ValueError, list,
+                          ciw.read_binary_records(file_name))
+        os.remove(file_name)
+
+    def test_columnar_sink(self):
+        ciw.seed(2)
+        S = ciw.ColumnarSink()
+        Q = ciw.Simulation(self.N, record_sink=S)
+        Q.simulate_until_max_time(50)
+        self.assertEqual(len(S), len(self.expected))
+        self.assertEqual(S.column_chunks('waiting_time')[0].typecode, 'd')
+        self.assertEqual(S.column_chunks('node')[0].typecode, 'q')
+        self.assertEqual(sorted(Q.get_all_records()), self.expected)
+        self.assertEqual(Q.nodes[-1].all_individuals, [])
+
+        ciw.seed(2)
+        S = ciw.ColumnarSink(chunk_size=7)
+        Q = ciw.Simulation(self.N, record_sink=S)
+        Q.simulate_until_max_time(50)
+        self.assertEqual(len(S), len(self.expected))
+        self.assertEqual([len(c) for c in S.column_chunks('node')[:-1]],
+                         [7] * (len(S.chunks) - 1))
+        self.assertEqual(sorted(Q.get_all_records()), self.expected)
+        self.assertRaises(ValueError, ciw.ColumnarSink, 0)
+
+    @unittest.skipIf(ciw.record_sinks.np is None, "numpy is not installed")
+    def test_columnar_sink_numpy_export(self):
+        ciw.seed(2)
+        S = ciw.ColumnarSink()
+        Q = ciw.Simulation(self.N, record_sink=S)
+        Q.simulate_until_max_time(25)
+        columns = S.to_numpy()
+        n = len(columns['id_number'])
+        self.assertEqual(n, len(S))
+        columns['service_time'][0] = -1.0
+        self.assertEqual(S.column_chunks('service_time')[0][0], -1.0)
+
+        Q.simulate_until_max_time(50)
+        self.assertEqual(len(columns['id_number']), n)
+        self.assertEqual(len(S), len(self.expected))
+        self.assertEqual(len(S.chunks), 2)
+        self.assertEqual(len(S.chunks[0][0]), n)
+        columns = S.to_numpy()
+        waits = [r.waiting_time for r in self.expected if r.node == 1]
+        self.assertAlmostEqual(columns['waiting_time'][
+            columns['node'] == 1].sum(), sum(waits))
+
+        chunks = S.to_numpy_chunks()
+        chunks['service_time'][1][0] = -2.0
+        self.assertEqual(S.column_chunks('service_time')[1][0], -2.0)
+        self.assertEqual(sum(len(c) for c in chunks['node']), len(S))
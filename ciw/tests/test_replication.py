@@ -0,0 +1,114 @@
+import unittest
+import ciw
+
+
+def summarise_arrivals(Q, warmup):
+    return {'arrivals': Q.nodes[0].number_of_individuals}
+
+
+def summarise_sketches(Q, warmup):
+    return {'arrivals': Q.nodes[0].number_of_individuals,
+            'statistics': Q.statistics,
+            'quantiles': Q.quantiles}
+
+
+def summarise_names(Q, warmup):
+    return {'name': Q.name}
+
+
+class TestReplication(unittest.TestCase):
+
+    def setUp(self):
+        self.params = {'Arrival_distributions': [['Exponential', 5.0]],
+                       'Service_distributions': [['Exponential', 8.0]],
+                       'Transition_matrices': [[0.0]],
+                       'Number_of_servers': [1]}
+
+    def test_replications_match_serial_loop(self):
+        average_waits = []
+        for s in range(10):
+            ciw.seed(s)
+            Q = ciw.Simulation(ciw.create_network(self.params))
+            Q.simulate_until_max_time(100)
+            recs = Q.get_all_records()
+            waits = [r.waiting_time for r in recs if r.arrival_date > 10]
+            average_waits.append(sum(waits) / len(waits))
+
+        R = ciw.run_replications(self.params, 10, max_time=100,
+            warmup=10, processes=1)
+        self.assertEqual([s['mean_waiting_time'] for s in R.summaries],
+                         average_waits)
+        stats = R.statistics['mean_waiting_time']
+        self.assertAlmostEqual(stats.mean, sum(average_waits) / 10)
+        self.assertTrue(stats.confidence_interval[0] < stats.mean <
+                        stats.confidence_interval[1])
+
+    def test_results_independent_of_processes(self):
+        N = ciw.create_network(self.params)
+        results = [ciw.run_replications(N, 6, max_customers=50, seed=3,
+            processes=p) for p in [1, 2, 3]]
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(results[0].summaries[0]['number_of_records'], 50)
+
+    def test_custom_summary_and_kwargs(self):
+        R = ciw.run_replications(self.params, 4, max_time=20,
+            processes=2, summarise=summarise_arrivals, tie_break='Ordered')
+        self.assertEqual(list(R.statistics), ['arrivals'])
+        self.assertEqual(len(R.summaries), 4)
+
+    def test_invalid_run_specifications(self):
+        self.assertRaises(ValueError, ciw.run_replications, self.params, 4)
+        self.assertRaises(ValueError, ciw.run_replications, self.params, 4,
+            max_time=10, max_customers=10)
+        self.assertRaises(ValueError, ciw.run_replications, self.params, 0,
+            max_time=10)
+
+    def test_aggregate(self):
+        stats = ciw.aggregate([{'x': 1.0}, {'x': 2.0}, {'x': 6.0}])
+        self.assertEqual(stats['x'].mean, 3.0)
+        self.assertEqual(stats['x'].variance, 7.0)
+        low, high = stats['x'].confidence_interval
+        self.assertAlmostEqual(high - 3.0, 4.302653 * (7.0 / 3) ** 0.5, 5)
+        self.assertAlmostEqual(ciw.student_t_quantile(0.975, 4), 2.776445, 5)
+        self.assertAlmostEqual(ciw.student_t_quantile(0.975, 1), 12.706205, 5)
+        self.assertAlmostEqual(ciw.student_t_quantile(0.995, 29), 2.756386, 5)
+        self.assertAlmostEqual(ciw.student_t_quantile(0.025, 9), -2.262157, 5)
+        single = ciw.aggregate([{'x': 1.0}])['x']
+        self.assertNotEqual(single.confidence_interval[0],
+                            single.confidence_interval[0])
+
+    def test_aggregate_mergeable_summaries(self):
+        R = ciw.run_replications(self.params, 3, max_time=20, processes=1,
+            summarise=summarise_sketches, online_statistics=True,
+            quantile_sketches=True)
+        self.assertEqual(sorted(R.statistics),
+                         ['arrivals', 'quantiles', 'statistics'])
+        waits = R.statistics['statistics'][1][0].waiting_time
+        self.assertEqual(waits.count, sum(
+            s['statistics'][1][0].waiting_time.count for s in R.summaries))
+        self.assertEqual(R.statistics['quantiles'][1][0].waiting_time.count,
+                         waits.count)
+        self.assertEqual(R.summaries[0]['statistics'][1][0].waiting_time.count,
+            R.summaries[0]['quantiles'][1][0].waiting_time.count)
+        self.assertRaises(ValueError, ciw.run_replications, self.params, 2,
+            max_time=20, processes=1, summarise=summarise_names)
+
+    def test_aggregate_exact(self):
+        R = ciw.run_replications(self.params, 3, max_time=20, processes=1,
+            exact=26)
+        self.assertEqual(sorted(R.statistics), sorted(R.summaries[0]))
+        waits = [float(s['mean_waiting_time']) for s in R.summaries]
+        self.assertAlmostEqual(R.statistics['mean_waiting_time'].mean,
+                               sum(waits) / 3)
+
+    def test_warmup_in_ticks(self):
+        ciw.seed(2)
+        Q = ciw.Simulation(ciw.create_network(self.params),
+                           ticks_per_unit=100)
+        Q.simulate_until_max_time(50)
+        summary = ciw.summarise_records(Q, warmup=10)
+        self.assertEqual(summary['number_of_records'], len(
+            [r for r in Q.get_all_records() if r.arrival_date > 1000]))
+        self.assertLess(summary['number_of_records'],
+                        len(Q.get_all_records()))
@@ -0,0 +1,79 @@
+import unittest
+import ciw
+
+
+class TestSamplers(unittest.TestCase):
+
+    def test_find_distributions_compiles_samplers(self):
+        params = {'Arrival_distributions': [['Exponential', 5.0],
+                                            'NoArrivals'],
+                  'Service_distributions': [['Uniform', 1.0, 2.0],
+                                            ['Custom', [[0.5, 1.0],
+                                                        [0.5, 3.0]]]],
+                  'Transition_matrices': [[0.0, 0.0], [0.0, 0.0]],
+                  'Number_of_servers': [1, 1]}
+        Q = ciw.Simulation(ciw.create_network(params))
+        self.assertIsInstance(Q.inter_arrival_times[1][0],
+            ciw.ExponentialSampler)
+        self.assertEqual(Q.inter_arrival_times[1][0].rate, 5.0)
+        self.assertIsInstance(Q.inter_arrival_times[2][0],
+            ciw.NoArrivalsSampler)
+        self.assertIsInstance(Q.service_times[1][0], ciw.UniformSampler)
+        self.assertEqual((Q.service_times[1][0].lower,
+            Q.service_times[1][0].upper), (1.0, 2.0))
+        self.assertIsInstance(Q.service_times[2][0], ciw.CustomSampler)
+        self.assertEqual(Q.service_times[2][0].probs, [0.5, 0.5])
+        self.assertEqual(Q.service_times[2][0].values, [1.0, 3.0])
+
+    def test_sample_and_call_agree(self):
+        S = ciw.TriangularSampler(1.0, 5.0, 2.0)
+        ciw.seed(3)
+        called = [S() for _ in range(5)]
+        ciw.seed(3)
+        sampled = [S.sample(2.0) for _ in range(5)]
+        self.assertEqual(called, sampled)
+        self.assertEqual(ciw.DeterministicSampler(4.4).sample(), 4.4)
+        self.assertEqual(ciw.NoArrivalsSampler().sample(10.0), float('Inf'))
+
+    def test_user_defined_samplers(self):
+        S = ciw.TimeDependentSampler(lambda t: t / 2.0)
+        self.assertEqual(S.sample(3.0), 1.5)
+        self.assertEqual(S(8.0), 4.0)
+        self.assertRaises(ValueError,
+            ciw.TimeDependentSampler(lambda t: -t).sample, 3.0)
+        S = ciw.UserDefinedSampler(lambda: 2.5)
+        self.assertEqual(S.sample(7.0), 2.5)
+        self.assertRaises(ValueError, ciw.UserDefinedSampler(lambda: 2).sample)
+
+    @unittest.skipIf(ciw.samplers.np is None, "numpy is not installed")
+    def test_numpy_backend_block_size_invariance(self):
+        params = {'Arrival_distributions': [['Exponential', 5.0],
+                                            ['Custom', [[0.2, 1.0],
+                                                        [0.8, 2.0]]]],
+                  'Service_distributions': [['Gamma', 2.0, 0.5],
+                                            ['Empirical', [1.0, 2.0, 3.5]]],
+                  'Transition_matrices': [[0.0, 0.2], [0.1, 0.0]],
+                  'Number_of_servers': [2, 1]}
+        samples = []
+        for block_size in [1, 7, 1000]:
+            ciw.seed(3)
+            Q = ciw.Simulation(ciw.create_network(params),
+                sampling_backend='numpy', block_size=block_size)
+            self.assertIsInstance(Q.service_times[1][0], ciw.BufferedSampler)
+            Q.simulate_until_max_time(50)
+            samples.append([r.service_time for r in Q.get_all_records()] +
+                [Q.inter_arrival_times[2][0]() for _ in range(20)] +
+                [Q.service_times[2][0]() for _ in range(20)])
+        self.assertEqual(samples[0], samples[1])
+        self.assertEqual(samples[0], samples[2])
+        self.assertTrue(set(samples[0][-40:-20]) <= set([1.0, 2.0]))
+        self.assertTrue(set(samples[0][-20:]) <= set([1.0, 2.0, 3.5]))
+
+    def test_sampling_backend_option(self):
+        N = ciw.create_network('ciw/tests/testing_parameters/params.yml')
+        self.assertEqual(ciw.Simulation(N).sampling_backend, 'random')
+        self.assertRaises(ValueError, ciw.Simulation, N,
+            sampling_backend='Jibberish')
+        self.assertRaises(ValueError, ciw.BufferedSampler, None, 0)
+        self.assertEqual(ciw.find_numpy_sampler(
+            ['Deterministic', 2.0], (0, 1, 0)), None)
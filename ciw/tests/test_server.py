@@ -13,7 +13,7 @@ class TestServer(unittest.TestCase):
         self.assertEqual(s.id_number, 3)
         self.assertEqual(s.node, N)
         self.assertEqual(s.node.id_number, 2)
-        self.assertEqual(s.cust, False)
+        self.assertIsNone(s.cust)
         self.assertEqual(s.busy, False)
         self.assertEqual(s.offduty, False)
 
@@ -1,8 +1,10 @@
 import unittest
 import ciw
 from hypothesis import given
-from hypothesis.strategies import floats, integers, random_module
+from hypothesis.strategies import (floats, integers, random_module, lists,
+                                   tuples, booleans)
 import os
+import random
 from decimal import Decimal
 import networkx as nx
 import csv
@@ -84,6 +86,31 @@ class TestSimulation(unittest.TestCase):
             i -= 1
         self.assertEqual(str(Q.find_next_active_node()), 'Node 4')
 
+    def test_mark_changed_method(self):
+        ciw.seed(5)
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        self.assertEqual(Q.changed_nodes, {})
+        Q.mark_changed(Q.nodes[2])
+        self.assertEqual(list(Q.changed_nodes), [Q.nodes[2]])
+
+        Q = ciw.Simulation(ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml'))
+        next_active_node = Q.find_next_active_node()
+        current_time = next_active_node.next_event_date
+        Q.nodes[0].next_node = 3
+        next_active_node = Q.event_and_return_nextnode(
+            next_active_node, current_time)
+        self.assertEqual(Q.changed_nodes, {})
+        self.assertEqual(len(Q.nodes[3].all_individuals), 1)
+        self.assertEqual(Q.nodes[3].next_event_date,
+            Q.nodes[3].all_individuals[0].service_end_date)
+        for node in Q.transitive_nodes[:2] + Q.transitive_nodes[3:]:
+            self.assertEqual(node.next_event_date, float('Inf'))
+
+        Q.nodes[1].accept(ciw.Individual(99), current_time)
+        self.assertEqual(list(Q.changed_nodes), [Q.nodes[1]])
+
     def test_simulate_until_max_time_method(self):
         ciw.seed(2)
         Q = ciw.Simulation(ciw.create_network(
@@ -212,40 +239,107 @@ class TestSimulation(unittest.TestCase):
         Q = ciw.Simulation(ciw.create_network(
             'ciw/tests/testing_parameters/params_deadlock.yml'),
              deadlock_detector='StateDigraph')
-        nodes = ['A', 'B', 'C', 'D', 'E']
-        connections = [('A', 'D'), ('A', 'B'), ('B', 'E'), ('C', 'B'), ('E', 'C')]
-        Q.deadlock_detector.statedigraph = nx.DiGraph()
-        for nd in nodes:
-            Q.deadlock_detector.statedigraph.add_node(nd)
+        Q.deadlock_detector = ciw.deadlock_detector.StateDigraphMethod()
+        A, B, C, D, E = [Q.deadlock_detector.add_vertex() for _ in range(5)]
+        connections = [(A, D), (A, B), (B, E), (C, B), (E, C)]
         for cnctn in connections:
-            Q.deadlock_detector.statedigraph.add_edge(cnctn[0], cnctn[1])
+            Q.deadlock_detector.add_edge(cnctn[0], cnctn[1])
         self.assertEqual(Q.deadlock_detector.detect_deadlock(), True)
 
-        Q = ciw.Simulation(ciw.create_network(
-            'ciw/tests/testing_parameters/params_deadlock.yml'),
-             deadlock_detector='StateDigraph')
-        nodes = ['A', 'B', 'C', 'D']
-        connections = [('A', 'B'), ('A', 'C'), ('B', 'C'), ('B', 'D')]
-        Q.deadlock_detector.statedigraph = nx.DiGraph()
-        for nd in nodes:
-            Q.deadlock_detector.statedigraph.add_node(nd)
+        Q.deadlock_detector = ciw.deadlock_detector.StateDigraphMethod()
+        A, B, C, D = [Q.deadlock_detector.add_vertex() for _ in range(4)]
+        connections = [(A, B), (A, C), (B, C), (B, D)]
         for cnctn in connections:
-            Q.deadlock_detector.statedigraph.add_edge(cnctn[0], cnctn[1])
+            Q.deadlock_detector.add_edge(cnctn[0], cnctn[1])
         self.assertEqual(Q.deadlock_detector.detect_deadlock(), False)
 
-        Q = ciw.Simulation(ciw.create_network(
-            'ciw/tests/testing_parameters/params_deadlock.yml'),
-             deadlock_detector='StateDigraph')
-        nodes = ['A', 'B']
-        Q.deadlock_detector.statedigraph = nx.DiGraph()
-        for nd in nodes:
-            Q.deadlock_detector.statedigraph.add_node(nd)
+        Q.deadlock_detector = ciw.deadlock_detector.StateDigraphMethod()
+        A, B = [Q.deadlock_detector.add_vertex() for _ in range(2)]
         self.assertEqual(Q.deadlock_detector.detect_deadlock(), False)
-        connections = [('A', 'A')]
+        connections = [(A, A)]
         for cnctn in connections:
-            Q.deadlock_detector.statedigraph.add_edge(cnctn[0], cnctn[1])
+            Q.deadlock_detector.add_edge(cnctn[0], cnctn[1])
         self.assertEqual(Q.deadlock_detector.detect_deadlock(), True)
 
+    @given(operations=lists(tuples(booleans(),
+                                   integers(min_value=0, max_value=5),
+                                   integers(min_value=0, max_value=5)),
+                            max_size=40))
+    def test_detect_new_deadlock_matches_full_check(self, operations):
+        D = ciw.deadlock_detector.StateDigraphMethod()
+        for _ in range(6):
+            D.add_vertex()
+        for add, tail, head in operations:
+            if add:
+                D.add_edge(tail, head)
+            else:
+                D.remove_edges(head)
+            digraph = nx.DiGraph()
+            digraph.add_nodes_from(range(6))
+            digraph.add_edges_from((t, h) for t in range(6)
+                                   for h in D.successors[t])
+            deadlocked = any(
+                set(nx.descendants(digraph, next(iter(component)))) <= component
+                and digraph.subgraph(component).number_of_edges() > 0
+                for component in map(set,
+                    nx.strongly_connected_components(digraph)))
+            self.assertEqual(D.detect_deadlock(), deadlocked)
+            self.assertEqual(D.detect_new_deadlock(), deadlocked)
+            self.assertEqual(D.changed_vertices, set())
+            if deadlocked:
+                break
+
+    def test_deadlock_analysis(self):
+        N = ciw.create_network(
+            'ciw/tests/testing_parameters/params_deadlock.yml')
+        analysis = ciw.analyse_deadlock(N)
+        self.assertEqual(analysis.verdict, 'possible')
+        Q = ciw.Simulation(N)
+        self.assertIsNone(Q._deadlock_analysis)
+        self.assertEqual(Q.deadlock_analysis, analysis)
+        Q = ciw.Simulation(N, deadlock_detector='StateDigraph')
+        self.assertEqual(Q._deadlock_analysis, analysis)
+        self.assertEqual(Q.deadlock_analysis, analysis)
+        self.assertIsInstance(Q.deadlock_detector,
+                              ciw.deadlock_detector.StateDigraphMethod)
+
+        params = {'Arrival_distributions': [['Exponential', 1.0],
+                                            ['Exponential', 1.0]],
+                  'Service_distributions': [['Exponential', 2.0],
+                                            ['Exponential', 2.0]],
+                  'Transition_matrices': [[0.0, 0.5], [0.0, 0.0]],
+                  'Number_of_servers': [1, 1],
+                  'Queue_capacities': [2, 2]}
+        N = ciw.create_network(params)
+        self.assertEqual(ciw.analyse_deadlock(N).verdict, 'deadlock-free')
+        Q = ciw.Simulation(N, deadlock_detector='StateDigraph')
+        self.assertIsInstance(Q.deadlock_detector,
+                              ciw.deadlock_detector.StateDigraphMethod)
+        self.assertFalse(Q.deadlock_detector.active)
+        self.assertRaises(ValueError, Q.simulate_until_deadlock)
+        Q.simulate_until_max_time(10)
+        self.assertEqual(sorted(Q.deadlock_detector.statedigraph.nodes()),
+            ['Server 1 at Node 1', 'Server 1 at Node 2'])
+        self.assertEqual(list(Q.deadlock_detector.statedigraph.edges()), [])
+
+        params['Transition_matrices'] = [[0.0, 0.5], [0.5, 0.0]]
+        N = ciw.create_network(params)
+        analysis = ciw.analyse_deadlock(N)
+        self.assertEqual(analysis,
+            ('possible', 'Nodes 1 -> 2 -> 1 can block each other.'))
+
+        params['Number_of_servers'] = [1, 'Inf']
+        N = ciw.create_network(params)
+        self.assertEqual(ciw.analyse_deadlock(N).verdict, 'deadlock-free')
+
+        self.assertEqual(
+            ciw.analyse_deadlock(N, custom_nodes=True).verdict, 'unknown')
+        Q = ciw.Simulation(N, deadlock_detector='StateDigraph',
+                           node_class=ciw.Node)
+        self.assertEqual(Q.deadlock_analysis.verdict, 'unknown')
+        self.assertIsInstance(Q.deadlock_detector,
+                              ciw.deadlock_detector.StateDigraphMethod)
+
     def test_mm1_from_file(self):
         Q = ciw.Simulation(ciw.create_network(
             'ciw/tests/testing_parameters/params_mm1.yml'))
@@ -405,6 +499,48 @@ class TestSimulation(unittest.TestCase):
             ['0.50', '0.51', '0.52', '0.53', '0.54']])
         self.assertEqual(set(mod_service_starts), expected_set)
 
+    def test_ticks(self):
+        params = {'Arrival_distributions': [['Exponential', 20]],
+                  'Service_distributions': [['Deterministic', 0.01]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': ['server_schedule'],
+                  'server_schedule': [[0.5, 0], [0.55, 1], [3.0, 0]]}
+        N = ciw.create_network(params)
+
+        ciw.seed(777)
+        Q = ciw.Simulation(N, ticks_per_unit=1000)
+        self.assertIsInstance(Q.transitive_nodes[0], ciw.TickNode)
+        self.assertIsInstance(Q.nodes[0], ciw.TickArrivalNode)
+        self.assertEqual(Q.transitive_nodes[0].cyclelength, 3000)
+        Q.simulate_until_max_time(10)
+        recs = Q.get_all_records()
+        self.assertTrue(all(r.service_start_date <= 10000 for r in recs))
+        self.assertTrue(all(isinstance(r.service_time, int) for r in recs))
+        self.assertEqual(set(r.service_time for r in recs), set([10]))
+        mod_service_starts = [obs % 3000 for obs in [r[5] for r in recs]]
+        self.assertEqual(set(mod_service_starts),
+                         set([500, 510, 520, 530, 540]))
+        self.assertEqual(Q.to_time(Q.to_ticks(2.5)), 2.5)
+        self.assertEqual(Q.to_ticks(float('Inf')), float('Inf'))
+
+        self.assertRaises(ValueError, ciw.Simulation, N, ticks_per_unit=0)
+        self.assertRaises(ValueError, ciw.Simulation, N, ticks_per_unit=0.5)
+        self.assertRaises(ValueError, ciw.Simulation, N,
+                          exact=14, ticks_per_unit=1000)
+
+    def test_ticks_time_dependent(self):
+        def service(t):
+            return 1.0 if t < 5.0 else 2.0
+        params = {'Arrival_distributions': [['Deterministic', 3.0]],
+                  'Service_distributions': [['TimeDependent', service]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': [1]}
+        Q = ciw.Simulation(ciw.create_network(params), ticks_per_unit=10)
+        Q.simulate_until_max_time(20)
+        recs = Q.get_all_records()
+        self.assertEqual([(r.arrival_date, r.service_time) for r in recs],
+            [(30, 10), (60, 20), (90, 20), (120, 20), (150, 20)])
+
     def test_setting_classes(self):
         class DummyNode(ciw.Node):
             pass
@@ -717,4 +853,41 @@ class TestSimulation(unittest.TestCase):
         total_inds_0 = len(Q.nodes[1].all_individuals)
 
         self.assertEqual(recs, [])
-        self.assertEqual(total_inds_0, total_inds_1)
\ No newline at end of file
+        self.assertEqual(total_inds_0, total_inds_1)
+
+    def test_independent_streams(self):
+        params = {
+            'Arrival_distributions': [['Exponential', 5.0],
+                                      ['Exponential', 3.0]],
+            'Service_distributions': [['Exponential', 8.0],
+                                      ['Exponential', 4.0]],
+            'Transition_matrices': [[0.2, 0.3], [0.1, 0.1]],
+            'Number_of_servers': [2, 1]
+        }
+        faster_params = dict(params)
+        faster_params['Service_distributions'] = [['Exponential', 8.0],
+                                                  ['Exponential', 6.0]]
+
+        def arrivals(params, independent_streams):
+            ciw.seed(7)
+            Q = ciw.Simulation(ciw.create_network(params),
+                independent_streams=independent_streams)
+            Q.simulate_until_max_time(50)
+            return (Q.nodes[0].number_of_individuals,
+                    Q.nodes[0].event_dates_dict)
+
+        self.assertEqual(arrivals(params, True),
+                         arrivals(params, True))
+        self.assertEqual(arrivals(params, True),
+                         arrivals(faster_params, True))
+        self.assertNotEqual(arrivals(params, False),
+                            arrivals(faster_params, False))
+
+        ciw.seed(7)
+        Q = ciw.Simulation(ciw.create_network(params),
+            independent_streams=True)
+        self.assertIsNot(Q.find_rng('Ser', 1, 0), Q.find_rng('Ser', 2, 0))
+        self.assertIs(Q.find_rng('Ser', 1, 0), Q.service_times[1][0].rng)
+        self.assertIs(Q.find_rng('Routing', 1, 0), Q.nodes[1].routing[0].rng)
+        Q = ciw.Simulation(ciw.create_network(params))
+        self.assertIs(Q.find_rng('Ser', 1, 0), random)
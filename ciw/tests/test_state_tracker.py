@@ -1,5 +1,7 @@
 import unittest
 import ciw
+from hypothesis import given
+from hypothesis.strategies import lists, tuples, integers
 
 class TestStateTracker(unittest.TestCase):
 
@@ -51,12 +53,12 @@ class TestStateTracker(unittest.TestCase):
             srvr = N.find_free_server()
             N.attach_server(srvr, ind)
         self.assertEqual(Q.statetracker.state, None)
-        N.release(0, Q.nodes[1], 43.11)
+        N.release(N.all_individuals[0], Q.nodes[1], 43.11)
         self.assertEqual(Q.statetracker.state, None)
         N.all_individuals[1].is_blocked = True
-        N.release(1, Q.nodes[1], 46.72)
+        N.release(N.all_individuals[1], Q.nodes[1], 46.72)
         self.assertEqual(Q.statetracker.state, None)
-        N.release(1, Q.nodes[-1], 46.72)
+        N.release(N.all_individuals[1], Q.nodes[-1], 46.72)
         self.assertEqual(Q.statetracker.state, None)
 
     def test_base_block_method_within_simulation(self):
@@ -134,12 +136,12 @@ class TestNaiveTracker(unittest.TestCase):
             N.attach_server(srvr, ind)
         Q.statetracker.state = [[4, 1], [3, 0], [5, 1], [0, 0]]
         self.assertEqual(Q.statetracker.state, [[4, 1], [3, 0], [5, 1], [0, 0]])
-        N.release(0, Q.nodes[1], 43.11)
+        N.release(N.all_individuals[0], Q.nodes[1], 43.11)
         self.assertEqual(Q.statetracker.state, [[5, 1], [3, 0], [4, 1], [0, 0]])
         N.all_individuals[1].is_blocked = True
-        N.release(1, Q.nodes[1], 46.72)
+        N.release(N.all_individuals[1], Q.nodes[1], 46.72)
         self.assertEqual(Q.statetracker.state, [[6, 1], [3, 0], [4, 0], [0, 0]])
-        N.release(1, Q.nodes[-1], 46.72)
+        N.release(N.all_individuals[1], Q.nodes[-1], 46.72)
         self.assertEqual(Q.statetracker.state, [[6, 1], [3, 0], [3, 0], [0, 0]])
 
     def test_naive_block_method_within_simulation(self):
@@ -164,6 +166,53 @@ class TestNaiveTracker(unittest.TestCase):
 
 
 
+    @given(operations=lists(tuples(integers(min_value=1, max_value=4),
+                                   integers(min_value=0, max_value=2)),
+                            max_size=300))
+    def test_naive_state_ids(self, operations):
+        Q = ciw.Simulation(ciw.create_network(
+          'ciw/tests/testing_parameters/params.yml'))
+        B = ciw.NaiveTracker(Q)
+        ids = {((0, 0), (0, 0), (0, 0), (0, 0)): 0}
+        self.assertEqual(B.state_id(), 0)
+        for node, change in operations:
+            if change == 0 or B.state[node - 1][0] == 0:
+                B.change_state_accept(node, 0)
+            elif change == 1:
+                B.change_state_block(node, 1, 0)
+            else:
+                B.change_state_release(node, 1, 0,
+                    B.state[node - 1][1] > 0)
+            ids.setdefault(B.hash_state(), len(ids))
+            self.assertEqual(B.state_id(), ids[B.hash_state()])
+            self.assertEqual(B.state_id(), ids[B.hash_state()])
+            self.assertEqual(B.state_of(B.state_id()), B.hash_state())
+        self.assertEqual([B.state_of(i) for i in range(len(B.states))],
+                         sorted(ids, key=ids.get))
+        zobrist = B.zobrist
+        B.state = [list(counts) for counts in B.state]
+        self.assertEqual(B.zobrist, zobrist)
+
+    def test_state_ids_with_colliding_hashes(self):
+        Q = ciw.Simulation(ciw.create_network(
+          'ciw/tests/testing_parameters/params.yml'))
+        for B in [ciw.NaiveTracker(Q), ciw.MatrixTracker(Q)]:
+            B.state_hash = lambda state_hash=B.state_hash: (
+                state_hash() >> 64 << 64)
+            self.assertEqual(B.state_id(), 0)
+            B.change_state_accept(1, 0)
+            self.assertEqual(B.state_id(), 1)
+            B.change_state_block(1, 2, 0)
+            self.assertEqual(B.state_id(), 2)
+            B.change_state_release(1, 2, 0, True)
+            self.assertEqual(B.state_id(), 0)
+            B.change_state_accept(1, 0)
+            self.assertEqual(B.state_id(), 1)
+            self.assertEqual(len(B.ids_by_hash), 1)
+            self.assertEqual(len(B.colliding_ids), 2)
+            self.assertEqual(len(B.states), 3)
+
+
 class TestMatrixTracker(unittest.TestCase):
 
     def test_matrix_init_method(self):
@@ -279,20 +328,20 @@ class TestMatrixTracker(unittest.TestCase):
                                                  [[1], [],  [], []],
                                                  [[],  [],  [], []]],
                                                  [5, 3, 6, 0]])
-        N.release(0, Q.nodes[1], 43.11)
+        N.release(N.all_individuals[0], Q.nodes[1], 43.11)
         self.assertEqual(Q.statetracker.state, [[[[],  [2], [], []],
                                                  [[],  [],  [], []],
                                                  [[1], [],  [], []],
                                                  [[],  [],  [], []]],
                                                  [6, 3, 5, 0]])
         N.all_individuals[1].is_blocked = True
-        N.release(1, Q.nodes[1], 46.72)
+        N.release(N.all_individuals[1], Q.nodes[1], 46.72)
         self.assertEqual(Q.statetracker.state, [[[[], [1], [], []],
                                                  [[], [],  [], []],
                                                  [[], [],  [], []],
                                                  [[], [],  [], []]],
                                                  [7, 3, 4, 0]])
-        N.release(1, Q.nodes[-1], 48.39)
+        N.release(N.all_individuals[1], Q.nodes[-1], 48.39)
         self.assertEqual(Q.statetracker.state, [[[[], [1], [], []],
                                                  [[], [],  [], []],
                                                  [[], [],  [], []],
@@ -338,3 +387,77 @@ class TestMatrixTracker(unittest.TestCase):
                                                  [[], [], [], []],
                                                  [[], [], [], []]],
                                                  [0, 0, 1, 0]])
+
+    def test_fenwick_tree(self):
+        F = ciw.FenwickTree()
+        values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+        for i, value in enumerate(values):
+            self.assertEqual(F.append(value), i + 1)
+        self.assertEqual(len(F), 11)
+        for i in range(12):
+            self.assertEqual(F.prefix_sum(i), sum(values[:i]))
+        F.add(4, -1)
+        values[3] -= 1
+        for i in range(12):
+            self.assertEqual(F.prefix_sum(i), sum(values[:i]))
+
+    @given(operations=lists(tuples(integers(min_value=1, max_value=3),
+                                   integers(min_value=1, max_value=3),
+                                   integers(min_value=0, max_value=1)),
+                            max_size=300))
+    def test_matrix_positions_match_list_matrix(self, operations):
+        Q = ciw.Simulation(ciw.create_network(
+          'ciw/tests/testing_parameters/params.yml'))
+        B = ciw.MatrixTracker(Q)
+        matrix = [[[] for _ in range(4)] for _ in range(4)]
+        populations = [0, 0, 0, 0]
+        ids = {}
+        for node, destination, block in operations:
+            if block or not matrix[node - 1][destination - 1]:
+                B.change_state_accept(node, 0)
+                populations[node - 1] += 1
+                B.change_state_block(node, destination, 0)
+                number_blocked = sum(len(c) for r in matrix for c in r)
+                matrix[node - 1][destination - 1].append(number_blocked + 1)
+            else:
+                B.change_state_release(node, destination, 0, True)
+                populations[node - 1] -= 1
+                position = matrix[node - 1][destination - 1].pop(0)
+                for row in matrix:
+                    for col in row:
+                        for o in range(len(col)):
+                            if col[o] > position:
+                                col[o] -= 1
+            self.assertEqual(B.hash_state(), (tuple(tuple(tuple(col)
+                for col in row) for row in matrix), tuple(populations)))
+            ids.setdefault(B.hash_state(), len(ids))
+            self.assertEqual(B.state_id(), ids[B.hash_state()])
+            self.assertEqual(B.state_of(B.state_id()), B.hash_state())
+            C = ciw.MatrixTracker(Q)
+            C.state = B.state
+            self.assertEqual(C.zobrist, B.zobrist)
+        self.assertEqual(B.state, [matrix, populations])
+        zobrist = B.zobrist
+        B.state = B.state
+        self.assertEqual(B.zobrist, zobrist)
+
+    def test_matrix_state_is_copied(self):
+        Q = ciw.Simulation(ciw.create_network(
+          'ciw/tests/testing_parameters/params.yml'))
+        B = ciw.MatrixTracker(Q)
+        populations = [2, 0, 0, 0]
+        B.state = [[[[1], [], [], []],
+                    [[], [], [], []],
+                    [[], [], [], []],
+                    [[], [], [], []]], populations]
+        populations[0] = 5
+        state = B.state
+        state[0][0][0].append(2)
+        state[-1][0] = 7
+        self.assertEqual(B.state, [[[[1], [], [], []],
+                                    [[], [], [], []],
+                                    [[], [], [], []],
+                                    [[], [], [], []]], [2, 0, 0, 0]])
+        self.assertEqual(B.hash_state(), (((((1,), (), (), ()),
+            ((), (), (), ()), ((), (), (), ()), ((), (), (), ())),
+            (2, 0, 0, 0))))
@@ -0,0 +1,83 @@
+import unittest
+import ciw
+
+
+class TestTimeAverages(unittest.TestCase):
+
+    def test_time_integral(self):
+        I = ciw.TimeIntegral()
+        self.assertEqual(I.integral_until(3.0), 0.0)
+        I.change(2, 1.0)
+        I.change(-1, 4.0)
+        self.assertEqual(I.level, 1)
+        self.assertEqual(I.integral, 6.0)
+        self.assertEqual(I.integral_until(6.0), 8.0)
+
+    def test_time_averages_match_records(self):
+        params = {
+            'Arrival_distributions': [['Exponential', 6.0],
+                                      ['Exponential', 2.5]],
+            'Service_distributions': [['Exponential', 8.5],
+                                      ['Exponential', 5.5]],
+            'Transition_matrices': [[0.0, 1.0],
+                                    [0.0, 0.0]],
+            'Number_of_servers': [2, 1],
+            'Queue_capacities': [3, 4]}
+        N = ciw.create_network(params)
+        ciw.seed(1)
+        Q = ciw.Simulation(N, time_averages=True)
+        Q.simulate_until_max_time(50)
+        date = Q.current_time
+        recs = Q.get_all_records()
+        for node in [1, 2]:
+            present = Q.transitive_nodes[node - 1].all_individuals
+            population = sum(r.exit_date - r.arrival_date
+                for r in recs if r.node == node)
+            population += sum(date - ind.arrival_date for ind in present)
+            busy = sum(r.exit_date - r.service_start_date
+                for r in recs if r.node == node)
+            busy += sum(date - ind.service_start_date
+                for ind in present if ind.server)
+            blocked = sum(r.time_blocked for r in recs if r.node == node)
+            self.assertAlmostEqual(
+                Q.time_averages.average_population(node), population / date)
+            self.assertAlmostEqual(
+                Q.time_averages.average_busy_servers(node), busy / date)
+            self.assertAlmostEqual(
+                Q.time_averages.utilisation(node),
+                busy / (date * N.service_centres[node - 1].number_of_servers))
+            self.assertGreaterEqual(
+                Q.time_averages.average_blocked(node), 0.0)
+            if node == 2:
+                self.assertEqual(Q.time_averages.average_blocked(node), 0.0)
+        self.assertAlmostEqual(
+            Q.time_averages.average_blocked(1),
+            (sum(r.time_blocked for r in recs if r.node == 1) + sum(
+                date - ind.service_end_date
+                for ind in Q.transitive_nodes[0].all_individuals
+                if ind.is_blocked)) / date)
+        self.assertEqual(Q.time_averages.average_population(1, 0),
+                         Q.time_averages.average_population(1))
+
+    def test_time_averages_infinite_servers(self):
+        N = ciw.create_network({
+            'Arrival_distributions': [['Exponential', 3.0]],
+            'Service_distributions': [['Exponential', 1.0]],
+            'Number_of_servers': ['Inf'],
+            'Transition_matrices': [[0.0]]})
+        ciw.seed(2)
+        Q = ciw.Simulation(N, time_averages=True)
+        self.assertNotEqual(Q.time_averages.average_population(1),
+                            Q.time_averages.average_population(1))
+        Q.simulate_until_max_time(20)
+        self.assertEqual(Q.time_averages.average_population(1),
+                         Q.time_averages.average_busy_servers(1))
+        utilisation = Q.time_averages.utilisation(1)
+        self.assertNotEqual(utilisation, utilisation)
+
+    def test_no_time_averages(self):
+        N = ciw.create_network(
+            'ciw/tests/testing_parameters/params.yml')
+        Q = ciw.Simulation(N)
+        self.assertIsInstance(Q.time_averages, ciw.NoTimeAverages)
+        self.assertNotIsInstance(Q.time_averages, ciw.TimeAverages)
@@ -0,0 +1,159 @@
+import unittest
+import ciw
+from decimal import Decimal
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_mser_init_method(self):
+        M = ciw.MSER()
+        self.assertEqual(M.batch_size, 5)
+        self.assertEqual(M.number_of_observations, 0)
+        self.assertEqual(M.truncation_point, 0)
+        self.assertEqual(M.warmup_time, 0.0)
+        self.assertNotEqual(M.mean, M.mean)
+        self.assertFalse(M.fixed)
+        self.assertRaises(ValueError, ciw.MSER, 0)
+        self.assertRaises(ValueError, ciw.MSER, 5, 7)
+        self.assertRaises(ValueError, ciw.MSER, 5, 2)
+        self.assertRaises(ValueError, ciw.MSER, 5, 10, 10)
+        self.assertRaises(ValueError, ciw.MSER, 5, 10, 1)
+
+    def test_mser_observe_method(self):
+        M = ciw.MSER(batch_size=2)
+        for i, value in enumerate([1.0, 2.0, 3.0, 4.0, 5.0]):
+            M.observe(value, i + 0.5)
+        self.assertEqual(M.batch_sums, [3.0, 7.0])
+        self.assertEqual(M.batch_end_dates, [1.5, 3.5])
+        self.assertEqual((M.partial_sum, M.partial_count), (5.0, 1))
+        self.assertEqual(M.number_of_observations, 5)
+
+    def test_mser_truncates_transient(self):
+        M = ciw.MSER()
+        values = [50.0 - i for i in range(50)] + [1.0, 2.0] * 100
+        for i, value in enumerate(values):
+            M.observe(value, float(i))
+        self.assertEqual(M.truncation_point, 50)
+        self.assertEqual(M.warmup_time, 49.0)
+        self.assertEqual(M.mean, 1.5)
+
+        M = ciw.MSER()
+        for i in range(100):
+            M.observe(float(i % 2), float(i))
+        self.assertEqual(M.truncation_point, 0)
+        self.assertEqual(M.mean, 0.5)
+
+    def test_mser_exact(self):
+        M = ciw.MSER(batch_size=2, max_batches=4, min_batches=2)
+        values = [Decimal('0.1') * i for i in range(9)]
+        for i, value in enumerate(values):
+            M.observe(value, Decimal(i))
+        self.assertIsInstance(M.mean, Decimal)
+        kept = values[M.truncation_point:]
+        self.assertEqual(M.mean, sum(kept) / len(kept))
+
+        params = {'Arrival_distributions': [['Exponential', 5.0]],
+                  'Service_distributions': [['Exponential', 8.0]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': [1]}
+        ciw.seed(3)
+        Q = ciw.Simulation(ciw.create_network(params),
+            warmup_detector='MSER5', exact=26)
+        Q.simulate_until_max_time(100)
+        recs = Q.get_all_records()
+        W = Q.warmup_detector.waiting_times
+        self.assertEqual(W.number_of_observations, len(recs))
+        self.assertIsInstance(W.mean, Decimal)
+        kept = [r.waiting_time for r in recs][W.truncation_point:]
+        self.assertAlmostEqual(W.mean, sum(kept) / len(kept))
+
+    def test_mser_fixes_truncation_point(self):
+        M = ciw.MSER()
+        values = [50.0 - i for i in range(50)] + [1.0, 2.0] * 100
+        for i, value in enumerate(values[:105]):
+            M.observe(value, float(i))
+        self.assertFalse(M.fixed)
+        self.assertEqual(M.truncation_point, 50)
+        for i, value in enumerate(values[105:]):
+            M.observe(value, float(i + 105))
+            if M.fixed:
+                break
+        self.assertEqual(M.number_of_observations, 110)
+        self.assertEqual((M.batch_sums, M.batch_end_dates), ([], []))
+        for i in range(1000):
+            M.observe(3.0, 110.0 + i)
+        self.assertEqual(M.truncation_point, 50)
+        self.assertEqual(M.warmup_time, 49.0)
+        self.assertEqual(M.number_of_observations, 1110)
+        self.assertEqual(M.batch_sums, [])
+        self.assertAlmostEqual(M.mean, (60 * 1.5 + 1000 * 3.0) / 1060)
+
+    def test_mser_bounded_memory(self):
+        M = ciw.MSER(batch_size=5, max_batches=10, min_batches=4)
+        for i in range(10000):
+            M.observe(-float(i), float(i))
+            self.assertLess(len(M.batch_sums), 10)
+        self.assertFalse(M.fixed)
+        self.assertEqual(M.batch_size, 1280)
+        self.assertEqual(M.batch_end_dates, [1279.0 + 1280 * i
+                                             for i in range(7)])
+        self.assertEqual((M.partial_count, M.number_of_observations),
+                         (1040, 10000))
+        self.assertEqual(sum(M.batch_sums) + M.partial_sum,
+                         -float(sum(range(10000))))
+        self.assertEqual(M.truncation_point, 3 * 1280)
+        self.assertEqual(M.warmup_time, 3839.0)
+        self.assertEqual(M.mean, -sum(range(3840, 10000)) / 6160)
+
+    def test_mser_detection_in_simulation(self):
+        params = {'Arrival_distributions': [['Exponential', 5.0]],
+                  'Service_distributions': [['Exponential', 8.0]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': [1]}
+        ciw.seed(3)
+        Q = ciw.Simulation(ciw.create_network(params),
+            warmup_detector='MSER5')
+        Q.simulate_until_max_time(100)
+        recs = Q.get_all_records()
+        W = Q.warmup_detector.waiting_times
+        S = Q.warmup_detector.sojourn_times
+        self.assertEqual(W.number_of_observations, len(recs))
+        self.assertEqual(S.number_of_observations, len(recs))
+        kept = [r.waiting_time for r in recs][W.truncation_point:]
+        self.assertAlmostEqual(W.mean, sum(kept) / len(kept))
+
+        Q = ciw.Simulation(ciw.create_network(params))
+        self.assertIsInstance(Q.warmup_detector, ciw.NoWarmupDetection)
+        self.assertRaises(ValueError, ciw.Simulation,
+            ciw.create_network(params), warmup_detector='Jibberish')
+
+    def test_mser_detection_discards_warmup(self):
+        params = {'Arrival_distributions': [['Exponential', 5.0]],
+                  'Service_distributions': [['Exponential', 8.0]],
+                  'Transition_matrices': [[0.0]],
+                  'Number_of_servers': [1]}
+        ciw.seed(3)
+        Q = ciw.Simulation(ciw.create_network(params),
+            warmup_detector='MSER5', online_statistics=True,
+            time_averages=True, quantile_sketches=True)
+        Q.simulate_until_max_time(100)
+        D = Q.warmup_detector
+        self.assertTrue(D.detected)
+        self.assertGreaterEqual(D.detection_date, D.warmup_time)
+        recs = Q.get_all_records()
+        kept = [r for r in recs if r.exit_date >= D.detection_date]
+        self.assertLess(len(kept), len(recs))
+        self.assertEqual(Q.statistics[1][0].waiting_time.count, len(kept))
+        self.assertAlmostEqual(Q.statistics[1][0].waiting_time.mean,
+            sum(r.waiting_time for r in kept) / len(kept))
+        self.assertEqual(Q.quantiles[1][0].waiting_time.count, len(kept))
+
+        date = Q.current_time
+        start = D.detection_date
+        population = sum(max(0.0, r.exit_date - max(r.arrival_date, start))
+                         for r in recs)
+        population += sum(date - max(ind.arrival_date, start)
+                          for ind in Q.transitive_nodes[0].all_individuals)
+        self.assertEqual(Q.time_averages.start_date, start)
+        self.assertAlmostEqual(Q.time_averages.average_population(1),
+                               population / (date - start))
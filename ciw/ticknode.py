@@ -0,0 +1,34 @@
+from .node import Node
+from .arrival_node import ArrivalNode
+
+class TickNode(Node):
+    """
+    Inherits from the Node class, keeps time as an integer
+    number of ticks, giving exact comparisons and ties between
+    dates without the cost of Decimal arithmetic.
+    """
+    def convert_date(self, date):
+        """
+        Converts a date given in time units to ticks
+        """
+        return self.simulation.to_ticks(date)
+
+    def get_service_time(self, cls, current_time):
+        """
+        Returns a service time for the given customer class, in ticks
+        """
+        return self.simulation.to_ticks(self.simulation.service_times[
+            self.id_number][cls].sample(self.simulation.to_time(current_time)))
+
+
+class TickArrivalNode(ArrivalNode):
+    """
+    Inherits from the ArrivalNode class, keeps time as an
+    integer number of ticks.
+    """
+    def inter_arrival(self, nd, cls, current_time):
+        """
+        Samples the inter-arrival time for next class and node, in ticks
+        """
+        return self.simulation.to_ticks(self.simulation.inter_arrival_times[
+            nd][cls].sample(self.simulation.to_time(current_time)))
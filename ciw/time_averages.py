@@ -0,0 +1,196 @@
+from __future__ import division
+
+
+class TimeIntegral(object):
+    """
+    Integrates a piecewise constant level over time. The level is
+    changed at given dates, and the integral up to any date after
+    the last change is found in constant time.
+    """
+    def __init__(self):
+        """
+        Initialises the integral of a level of zero
+        """
+        self.level = 0
+        self.last_date = 0
+        self.integral = 0
+
+    def change(self, delta, date):
+        """
+        Changes the level by delta at the given date.
+        """
+        self.integral += self.level * (date - self.last_date)
+        self.last_date = date
+        self.level += delta
+
+    def reset(self, date):
+        """
+        Restarts the integral at the given date, keeping the level.
+        """
+        self.integral = 0
+        self.last_date = date
+
+    def integral_until(self, date):
+        """
+        The integral of the level from time 0 until the given date.
+        """
+        return self.integral + self.level * (date - self.last_date)
+
+
+class NoTimeAverages(object):
+    """
+    A generic class to integrate the state of the nodes over time.
+    This overall class is equivalent to keeping no time averages.
+    """
+    def initialise_at_node(self, node):
+        """
+        Initialises the integrals when the node is created
+        """
+        pass
+
+    def action_at_accept(self, node, individual, date):
+        """
+        The action taken at the 'accept' method of the node.
+        """
+        pass
+
+    def action_at_release(self, node, individual, date):
+        """
+        The action taken at the 'release' method of the node.
+        """
+        pass
+
+    def action_at_blockage(self, node, individual, date):
+        """
+        The action taken at the 'block_individual' method of the node.
+        """
+        pass
+
+    def action_at_attach_server(self, node, individual, date):
+        """
+        The action taken at the 'attach_server' method of the node.
+        """
+        pass
+
+    def action_at_detach_server(self, node, customer_class, date):
+        """
+        The action taken when a busy server stops serving a
+        customer of the given class.
+        """
+        pass
+
+    def reset(self, date):
+        """
+        The action taken when the warm-up period is discarded.
+        """
+        pass
+
+
+class TimeAverages(NoTimeAverages):
+    """
+    Integrates, for each node and customer class, the number of
+    customers at the node, the number of busy servers, and the
+    number of blocked customers over time. At infinite server nodes
+    every customer at the node occupies a server.
+    """
+    def __init__(self, simulation):
+        """
+        Initialises the time averages class
+        """
+        self.simulation = simulation
+        self.number_of_classes = simulation.network.number_of_classes
+        self.start_date = 0
+        self.population = {}
+        self.busy_servers = {}
+        self.blocked = {}
+
+    def initialise_at_node(self, node):
+        classes = range(self.number_of_classes)
+        self.population[node.id_number] = [TimeIntegral() for _ in classes]
+        self.busy_servers[node.id_number] = [TimeIntegral() for _ in classes]
+        self.blocked[node.id_number] = [TimeIntegral() for _ in classes]
+
+    def action_at_accept(self, node, individual, date):
+        self.population[node.id_number][
+            individual.customer_class].change(1, date)
+        if node.c == float('Inf'):
+            self.busy_servers[node.id_number][
+                individual.customer_class].change(1, date)
+
+    def action_at_release(self, node, individual, date):
+        self.population[node.id_number][
+            individual.previous_class].change(-1, date)
+        if individual.is_blocked:
+            self.blocked[node.id_number][
+                individual.previous_class].change(-1, date)
+        if node.c == float('Inf'):
+            self.busy_servers[node.id_number][
+                individual.previous_class].change(-1, date)
+
+    def action_at_blockage(self, node, individual, date):
+        self.blocked[node.id_number][
+            individual.previous_class].change(1, date)
+
+    def action_at_attach_server(self, node, individual, date):
+        self.busy_servers[node.id_number][
+            individual.customer_class].change(1, date)
+
+    def action_at_detach_server(self, node, customer_class, date):
+        self.busy_servers[node.id_number][customer_class].change(-1, date)
+
+    def reset(self, date):
+        """
+        Restarts every integral at the given date, so that averages
+        are taken from then on.
+        """
+        self.start_date = date
+        for integrals in [self.population, self.busy_servers, self.blocked]:
+            for node_integrals in integrals.values():
+                for integral in node_integrals:
+                    integral.reset(date)
+
+    def average(self, integrals, node, customer_class, date):
+        """
+        The time average of the integrated level of the node (of
+        the given customer class, or summed over all classes) from
+        the start date, time 0 unless the warm-up was discarded,
+        until the date, the current time by default.
+        """
+        if date is None:
+            date = self.simulation.current_time
+        duration = date - self.start_date
+        if duration == 0:
+            return float('nan')
+        if customer_class is None:
+            return sum(integral.integral_until(date)
+                for integral in integrals[node]) / duration
+        return integrals[node][customer_class].integral_until(
+            date) / duration
+
+    def average_population(self, node, customer_class=None, date=None):
+        """
+        The time average number of customers at the node.
+        """
+        return self.average(self.population, node, customer_class, date)
+
+    def average_busy_servers(self, node, customer_class=None, date=None):
+        """
+        The time average number of busy servers at the node.
+        """
+        return self.average(self.busy_servers, node, customer_class, date)
+
+    def average_blocked(self, node, customer_class=None, date=None):
+        """
+        The time average number of blocked customers at the node.
+        """
+        return self.average(self.blocked, node, customer_class, date)
+
+    def utilisation(self, node, date=None):
+        """
+        The proportion of time the servers of the node were busy.
+        Only defined for nodes with a fixed, finite number of servers.
+        """
+        N = self.simulation.transitive_nodes[node - 1]
+        if N.schedule or N.c == float('Inf') or N.c == 0:
+            return float('nan')
+        return self.average_busy_servers(node, date=date) / N.c
@@ -0,0 +1,184 @@
+from __future__ import division
+
+
+class NoWarmupDetection(object):
+    """
+    A generic class to detect the warm-up period of a simulation.
+    This overall class is equivalent to having no warm-up
+    detection capabilities.
+    """
+    def __init__(self):
+        """
+        Initialises the detection mechanism class
+        """
+        pass
+
+    def observe_record(self, record):
+        """
+        The action taken when a node writes a data record.
+        """
+        pass
+
+
+class MSER(object):
+    """
+    A streaming MSER estimator of the truncation point of a series
+    of observations. Observations are grouped into batches of
+    batch_size, and only the batch sums are kept. The truncation
+    point is the number of batches d, over the first half of the
+    batches, minimising
+
+        sum_{i > d} (Y_i - mean(Y_{d+1}, ..., Y_k))^2 / (k - d)^2
+
+    where Y_i are the batch means. With batch_size 5 this is MSER-5.
+    The sums take the type of the observations, so Decimal
+    observations are summed exactly.
+
+    The truncation point is updated as each batch completes. At most
+    max_batches batches are kept: when they are all full, adjacent
+    pairs are merged, doubling the batch size. Once at least
+    min_batches batches have completed and the truncation point lies
+    strictly inside the first half of the batches, it is fixed. The
+    batches are then dropped, and only the sum and count of the
+    observations after the truncation point are kept.
+    """
+    def __init__(self, batch_size=5, max_batches=100, min_batches=20):
+        """
+        Initialises the estimator
+        """
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be a positive integer.")
+        if max_batches < 4 or max_batches % 2 != 0:
+            raise ValueError("'max_batches' must be an even integer, at least 4.")
+        if not 2 <= min_batches < max_batches:
+            raise ValueError(
+                "'min_batches' must be at least 2 and less than 'max_batches'.")
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.min_batches = min_batches
+        self.batch_sums = []
+        self.batch_end_dates = []
+        self.partial_sum = 0
+        self.partial_count = 0
+        self.number_of_observations = 0
+        self.truncation_batch = 0
+        self.truncation_point = 0
+        self.warmup_time = 0.0
+        self.kept_sum = 0
+        self.kept_count = 0
+        self.fixed = False
+
+    def observe(self, value, date):
+        """
+        Adds an observation, made at the given date, to the series.
+        """
+        self.number_of_observations += 1
+        if self.fixed:
+            self.kept_sum += value
+            self.kept_count += 1
+            return
+        self.partial_sum += value
+        self.partial_count += 1
+        if self.partial_count == self.batch_size:
+            self.batch_sums.append(self.partial_sum)
+            self.batch_end_dates.append(date)
+            self.partial_sum = 0
+            self.partial_count = 0
+            if len(self.batch_sums) == self.max_batches:
+                self.rebatch()
+            self.update_truncation()
+
+    def rebatch(self):
+        """
+        Merges adjacent pairs of batches, doubling the batch size.
+        """
+        sums = self.batch_sums
+        self.batch_sums = [sums[i] + sums[i + 1]
+                           for i in range(0, len(sums), 2)]
+        self.batch_end_dates = self.batch_end_dates[1::2]
+        self.batch_size *= 2
+
+    def update_truncation(self):
+        """
+        Finds the truncation point of the completed batches, with
+        suffix sums over the first half of the batches, and fixes
+        it if it lies strictly inside the first half.
+        """
+        k = len(self.batch_sums)
+        best_d, best_mser, best_total = 0, float('Inf'), 0
+        total, total_squares, kept_sum = 0, 0, 0
+        for d in range(k - 1, -1, -1):
+            kept_sum += self.batch_sums[d]
+            mean = self.batch_sums[d] / self.batch_size
+            total += mean
+            total_squares += mean * mean
+            n = k - d
+            if d <= k // 2:
+                mser = max(total_squares - total * total / n, 0) / (n * n)
+                if mser <= best_mser:
+                    best_d, best_mser, best_total = d, mser, kept_sum
+        self.truncation_batch = best_d
+        self.truncation_point = best_d * self.batch_size
+        if best_d == 0:
+            self.warmup_time = 0.0
+        else:
+            self.warmup_time = self.batch_end_dates[best_d - 1]
+        self.kept_sum = best_total
+        self.kept_count = (k - best_d) * self.batch_size
+        if k >= self.min_batches and best_d < k // 2:
+            self.fixed = True
+            self.batch_sums = []
+            self.batch_end_dates = []
+
+    @property
+    def mean(self):
+        """
+        The mean of the observations after the truncation point.
+        """
+        count = self.kept_count + self.partial_count
+        if count == 0:
+            return float('nan')
+        return (self.kept_sum + self.partial_sum) / count
+
+
+class MSERDetection(NoWarmupDetection):
+    """
+    Estimates the warm-up period from the waiting times, and the
+    times spent at a node (arrival to exit), of the records as they
+    are written, using a streaming MSER estimator for each. Once
+    both truncation points are fixed the warm-up is detected, and the
+    simulation's online statistics, quantile sketches and time
+    averages are restarted, discarding what they accumulated during
+    the warm-up.
+    """
+    def __init__(self, simulation, batch_size=5,
+                 max_batches=100, min_batches=20):
+        """
+        Initialises the MSER detection mechanism class
+        """
+        self.simulation = simulation
+        self.waiting_times = MSER(batch_size, max_batches, min_batches)
+        self.sojourn_times = MSER(batch_size, max_batches, min_batches)
+        self.detected = False
+        self.detection_date = None
+
+    @property
+    def warmup_time(self):
+        """
+        The later of the two estimated warm-up times.
+        """
+        return max(self.waiting_times.warmup_time,
+                   self.sojourn_times.warmup_time)
+
+    def observe_record(self, record):
+        """
+        Adds the record's waiting and sojourn times to the estimators.
+        """
+        self.waiting_times.observe(record.wait, record.exit_date)
+        self.sojourn_times.observe(record.exit_date - record.arrival_date,
+                                   record.exit_date)
+        if (not self.detected and self.waiting_times.fixed and
+            self.sojourn_times.fixed):
+            self.detected = True
+            self.detection_date = record.exit_date
+            self.simulation.discard_warmup(record.exit_date)